@@ -5,6 +5,7 @@ from logging.config import fileConfig
 from dotenv import load_dotenv  # <--- ДОБАВЛЕНО
 
 from sqlalchemy import engine_from_config
+from sqlalchemy import make_url
 from sqlalchemy import pool
 
 from alembic import context
@@ -26,8 +27,10 @@ config = context.config
 # Это самый надежный способ, который переопределит значение из alembic.ini
 # Берем асинхронный URL из .env
 async_db_url = os.getenv('DATABASE_URL')
-# Создаем синхронную версию, заменяя "+asyncpg" на "" (SQLAlchemy сама выберет psycopg2)
-sync_db_url = async_db_url.replace("+asyncpg", "")
+# Создаем синхронную версию, убирая асинхронный драйвер ("+asyncpg", "+aiosqlite"):
+# SQLAlchemy сама выберет драйвер по умолчанию (psycopg2, sqlite3)
+async_url = make_url(async_db_url)
+sync_db_url = async_url.set(drivername=async_url.get_backend_name()).render_as_string(hide_password=False)
 
 # Передаем Alembic именно СИНХРОННУЮ версию
 config.set_main_option('sqlalchemy.url', sync_db_url)
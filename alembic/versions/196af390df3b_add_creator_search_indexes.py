@@ -0,0 +1,34 @@
+"""Add creator search indexes
+
+Revision ID: 196af390df3b
+Revises: 87ec8c5871c1
+Create Date: 2026-10-18 12:10:41.203118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '196af390df3b'
+down_revision: Union[str, Sequence[str], None] = '87ec8c5871c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_users_bot_role'), 'users', ['bot_role'], unique=False)
+    # text_pattern_ops позволяет Postgres использовать индекс для LIKE 'префикс%'
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_index('ix_users_username_lower', 'users', [sa.text('lower(username) text_pattern_ops')], unique=False)
+    else:
+        op.create_index('ix_users_username_lower', 'users', [sa.text('lower(username)')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_username_lower', table_name='users')
+    op.drop_index(op.f('ix_users_bot_role'), table_name='users')
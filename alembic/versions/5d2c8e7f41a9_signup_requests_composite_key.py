@@ -0,0 +1,47 @@
+"""Make signup_requests key composite for multi-slot requests
+
+Revision ID: 5d2c8e7f41a9
+Revises: 196af390df3b
+Create Date: 2026-10-18 13:02:17.845310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2c8e7f41a9'
+down_revision: Union[str, Sequence[str], None] = '196af390df3b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _replace_primary_key(columns: list[str]) -> None:
+    # В SQLite первичный ключ безымянный и не удаляется отдельно: таблица
+    # пересоздается целиком с новым ключом
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table('signup_requests', recreate='always') as batch_op:
+            batch_op.create_primary_key('signup_requests_pkey', columns)
+        return
+    with op.batch_alter_table('signup_requests') as batch_op:
+        batch_op.drop_constraint('signup_requests_pkey', type_='primary')
+        batch_op.create_primary_key('signup_requests_pkey', columns)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Одно сообщение-заявка теперь может содержать несколько слотов
+    _replace_primary_key(['request_message_id', 'slot_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Перед возвратом к ключу по одному сообщению удаляем многослотовые заявки
+    op.execute(
+        "DELETE FROM signup_requests WHERE request_message_id IN ("
+        "SELECT request_message_id FROM signup_requests "
+        "GROUP BY request_message_id HAVING COUNT(*) > 1)"
+    )
+    _replace_primary_key(['request_message_id'])
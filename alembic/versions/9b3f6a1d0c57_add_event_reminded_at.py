@@ -0,0 +1,28 @@
+"""Add event reminded_at
+
+Revision ID: 9b3f6a1d0c57
+Revises: e41b7a09c3d2
+Create Date: 2026-10-18 16:02:47.531904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3f6a1d0c57'
+down_revision: Union[str, Sequence[str], None] = 'e41b7a09c3d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('events', sa.Column('reminded_at', sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('events', 'reminded_at')
@@ -0,0 +1,42 @@
+"""Add archived events
+
+Revision ID: c7e2d94a8f13
+Revises: 9b3f6a1d0c57
+Create Date: 2026-10-18 17:11:36.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2d94a8f13'
+down_revision: Union[str, Sequence[str], None] = '9b3f6a1d0c57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('archived_events',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('message_id', sa.BigInteger(), nullable=True),
+    sa.Column('channel_id', sa.BigInteger(), nullable=True),
+    sa.Column('thread_id', sa.BigInteger(), nullable=True),
+    sa.Column('owner_id', sa.BigInteger(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('event_timestamp', sa.BigInteger(), nullable=False),
+    sa.Column('slots', sa.JSON(), nullable=False),
+    sa.Column('archived_at', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_archived_events_owner_id'), 'archived_events', ['owner_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_archived_events_owner_id'), table_name='archived_events')
+    op.drop_table('archived_events')
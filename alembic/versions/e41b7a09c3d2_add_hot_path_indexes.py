@@ -0,0 +1,38 @@
+"""Add hot path indexes
+
+Revision ID: e41b7a09c3d2
+Revises: 5d2c8e7f41a9
+Create Date: 2026-10-18 14:21:05.117482
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e41b7a09c3d2'
+down_revision: Union[str, Sequence[str], None] = '5d2c8e7f41a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_event_slots_event_id'), 'event_slots', ['event_id'], unique=False)
+    op.create_index('ix_subscriptions_creator_subscriber', 'subscriptions', ['creator_id', 'subscriber_id'], unique=False)
+    op.create_index(op.f('ix_signup_requests_slot_id'), 'signup_requests', ['slot_id'], unique=False)
+    op.create_index(op.f('ix_template_roles_template_id'), 'template_roles', ['template_id'], unique=False)
+    op.create_index(op.f('ix_events_owner_id'), 'events', ['owner_id'], unique=False)
+    op.create_index(op.f('ix_events_event_timestamp'), 'events', ['event_timestamp'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_events_event_timestamp'), table_name='events')
+    op.drop_index(op.f('ix_events_owner_id'), table_name='events')
+    op.drop_index(op.f('ix_template_roles_template_id'), table_name='template_roles')
+    op.drop_index(op.f('ix_signup_requests_slot_id'), table_name='signup_requests')
+    op.drop_index('ix_subscriptions_creator_subscriber', table_name='subscriptions')
+    op.drop_index(op.f('ix_event_slots_event_id'), table_name='event_slots')
@@ -0,0 +1,45 @@
+"""Never reuse event ids on SQLite
+
+Revision ID: f2a6c0d9b7e4
+Revises: c7e2d94a8f13
+Create Date: 2026-10-18 21:40:52.317604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a6c0d9b7e4'
+down_revision: Union[str, Sequence[str], None] = 'c7e2d94a8f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # В PostgreSQL ID выдает последовательность, она значения не повторяет
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('events', recreate='always', table_kwargs={'sqlite_autoincrement': True}):
+        pass
+    # Счетчик продолжается после всех выданных ID, включая уже перенесенные в архив
+    op.execute(
+        "UPDATE sqlite_sequence SET seq = MAX(seq, (SELECT COALESCE(MAX(id), 0) FROM archived_events)) "
+        "WHERE name = 'events'"
+    )
+    op.execute(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'events', "
+        "MAX((SELECT COALESCE(MAX(id), 0) FROM events), (SELECT COALESCE(MAX(id), 0) FROM archived_events)) "
+        "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'events')"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('events', recreate='always', table_kwargs={'sqlite_autoincrement': False}):
+        pass
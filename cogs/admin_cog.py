@@ -2,9 +2,25 @@ import disnake
 from disnake.ext import commands
 from sqlalchemy.future import select
 
-from database.session import async_session_maker
+from database.session import transaction, pool_status
 from database.models import User, BotRole
 from database.crud.crud_user import get_or_create_user, set_user_role
+from database.cache import signup_index
+from services.instrumentation import summary
+
+
+def format_metric_rows(rows: list[tuple[str, int, float, float]]) -> str:
+    """Форматирует строки гистограммы для поля embed (не длиннее 1024 символов)."""
+    lines = [
+        f"`{label[:60]}` — {count} шт., p50 {p50 * 1000:.0f} мс, p99 {p99 * 1000:.0f} мс"
+        for label, count, p50, p99 in rows
+    ]
+    text = ""
+    for line in lines:
+        if len(text) + len(line) + 1 > 1024:
+            break
+        text += line + "\n"
+    return text or "Нет данных."
 
 
 class AdminCog(commands.Cog):
@@ -27,7 +43,7 @@ class AdminCog(commands.Cog):
         role: str = commands.Param(choices=[BotRole.USER, BotRole.EVENT_CREATOR, BotRole.ADMIN])
     ):
         await inter.response.defer(ephemeral=True)
-        async with async_session_maker() as session:
+        async with transaction("admin.setrole") as session:
             db_user = await get_or_create_user(session, user_id=user.id, username=user.name)
             await set_user_role(session, db_user, role)
         
@@ -36,5 +52,32 @@ class AdminCog(commands.Cog):
             ephemeral=True
         )
 
+    @admin.sub_command(name="stats", description="Показать метрики производительности бота")
+    async def stats(self, inter: disnake.ApplicationCommandInteraction):
+        await inter.response.defer(ephemeral=True)
+        embed = disnake.Embed(title="📊 Метрики бота", color=disnake.Color.blurple())
+        embed.add_field(
+            name="Обработчики", value=format_metric_rows(summary("bot_handler_seconds")), inline=False
+        )
+        embed.add_field(
+            name="SQL-запросы (по суммарному времени)",
+            value=format_metric_rows(summary("db_query_seconds", limit=5, sort_by="sum")), inline=False
+        )
+        embed.add_field(
+            name="REST Discord", value=format_metric_rows(summary("discord_rest_seconds", limit=5)), inline=False
+        )
+        pool = pool_status()
+        embed.add_field(
+            name="Пул соединений",
+            value=", ".join(f"{k}: {v}" for k, v in pool.items()) or "Не используется.", inline=False
+        )
+        index = signup_index.stats()
+        embed.add_field(
+            name="Индекс заявок",
+            value=f"Заявок: {index['size']}, попаданий: {index['hits']}, промахов: {index['misses']}",
+            inline=False
+        )
+        await inter.followup.send(embed=embed, ephemeral=True)
+
 def setup(bot):
     bot.add_cog(AdminCog(bot))
\ No newline at end of file
@@ -1,11 +1,24 @@
 import disnake
 from disnake.ext import commands
 import datetime
+import os
 import re
+from sqlalchemy import Row
 
-from database.session import async_session_maker
+from database.session import release, session_scope, transaction
 from database.models import Event, BotRole, EventSlot
+from database.cache import event_snapshots, event_versions, signup_index
+from database.invalidation import LocalBackend, bus
+from database.locks import event_locks
 from database.crud import crud_event, crud_template, crud_user, crud_subscription
+from services import event_embeds
+from services.event_snapshots import loader as event_snapshot_loader
+from services.notifier import SubscriberNotifier
+from services.reminders import ReminderScheduler
+from services.retention import RetentionJob
+from utils.debounce import KeyedDebouncer
+from utils.metrics import timed
+from utils.ttl_cache import TTLCache
 from .template_cog import autocomplete_template_name
 
 # --- Вспомогательные функции и классы ---
@@ -40,38 +53,37 @@ def parse_datetime(datetime_str: str) -> int | None:
     except ValueError:
         return None
 
-def format_event_embed(event: Event, guild: disnake.Guild) -> disnake.Embed:
+def format_event_embed(event: Event, guild: disnake.Guild, version: int) -> disnake.Embed:
+    """
+    Создает и форматирует Embed для анонса события (через кэш отрисовки, объект не изменять).
+    version — версия события из event_versions, прочитанная до загрузки event.
+    """
+    return event_embeds.renderer.render(event, guild, version)
 
-    """Создает и форматирует Embed для анонса события."""
-    embed = disnake.Embed(
-        title=f"📅 {event.title}",
-        description=event.description,
-        color=disnake.Color.green()
-    )
-    embed.add_field(
-        name="Время проведения",
-        value=f"<t:{event.event_timestamp}:F> (<t:{event.event_timestamp}:R>)",
-        inline=False
+# Префикс custom_id кнопки записи; ID события хранится прямо в custom_id
+SIGNUP_BUTTON_PREFIX = "event_signup:"
+
+def signup_button(event_id: int) -> disnake.ui.Button:
+    """Создает кнопку записи для анонса события."""
+    return disnake.ui.Button(
+        label="Записаться", style=disnake.ButtonStyle.success,
+        custom_id=f"{SIGNUP_BUTTON_PREFIX}{event_id}"
     )
-    
-    slot_texts = []
-    for slot in sorted(event.slots, key=lambda s: s.slot_number):
-        user_mention = f"<@{slot.signed_up_user_id}>" if slot.signed_up_user_id else "**[Свободно]**"
-        slot_texts.append(f"`{slot.slot_number}.` {slot.role_name}: {user_mention}")
-    
-    embed.add_field(
-        name="Участники",
-        value="\n".join(slot_texts) or "Слоты не определены.",
-        inline=False
+
+# Префикс custom_id кнопки подтверждения заявки организатором
+APPROVE_BUTTON_PREFIX = "signup_approve:"
+MAX_APPROVE_BUTTONS = 25
+
+def approve_button(slot: EventSlot | Row) -> disnake.ui.Button:
+    """Создает кнопку подтверждения заявки на конкретный слот."""
+    return disnake.ui.Button(
+        label=f"✅ {slot.slot_number}. {slot.role_name}"[:80], style=disnake.ButtonStyle.secondary,
+        custom_id=f"{APPROVE_BUTTON_PREFIX}{slot.id}"
     )
-    
-    owner = guild.get_member(event.owner_id)
-    embed.set_footer(text=f"ID события: {event.id} | Организатор: {owner.display_name if owner else 'Неизвестно'}")
-    return embed
 
 class SignupModal(disnake.ui.Modal):
-    def __init__(self, event: Event):
-        self.event = event
+    def __init__(self, event_id: int):
+        self.event_id = event_id
         components = [
             disnake.ui.TextInput(
                 label="Введите номер(а) слотов через запятую",
@@ -83,6 +95,7 @@ class SignupModal(disnake.ui.Modal):
         ]
         super().__init__(title="Запись на событие", components=components)
 
+    @timed("modal:signup")
     async def callback(self, inter: disnake.ModalInteraction):
         await inter.response.defer(ephemeral=True)
         slot_input = inter.text_values["slot_input"]
@@ -92,53 +105,71 @@ class SignupModal(disnake.ui.Modal):
             await inter.followup.send("❌ Неверный формат. Введите только номера, разделенные запятой.", ephemeral=True)
             return
 
-        valid_slots = [
-            slot for slot in self.event.slots 
-            if slot.slot_number in requested_slot_numbers and slot.signed_up_user_id is None
-        ]
+        # Слоты проверяются по снимку события, который сбрасывается при занятии слота;
+        # одновременные формы на одно событие делят одну загрузку из БД
+        snapshot = await event_snapshot_loader.get(self.event_id)
+        if not snapshot:
+            await inter.followup.send("Не удалось найти это событие. Возможно, оно было удалено.", ephemeral=True)
+            return
+
+        event = snapshot.header
+        valid_slots = snapshot.free_slots(requested_slot_numbers)
         if not valid_slots:
             await inter.followup.send("❌ Указанные слоты не существуют, заняты или введены неверно.", ephemeral=True)
             return
-        
-        await inter.response.defer(ephemeral=True)
 
-        thread = inter.channel.get_thread(self.event.thread_id)
+        thread = inter.channel.get_thread(event.thread_id)
         if not thread:
-            message = await inter.channel.fetch_message(self.event.message_id)
-            thread = await message.create_thread(name=f"Заявки на '{self.event.title}'")
-            async with async_session_maker() as session:
-                await crud_event.update_event_thread_id(session, self.event.id, thread.id)
+            thread = await self.get_or_create_thread(inter, event)
         
-        async with async_session_maker() as session:
-            for slot in valid_slots:
-                msg = await thread.send(f"Пользователь {inter.author.mention} подал заявку на слот "
-                                        f"`{slot.slot_number}. {slot.role_name}`. "
-                                        f"Организатор <@{self.event.owner_id}>, подтвердите запись.")
-                await msg.add_reaction("✅")
-                await crud_event.create_signup_request(
-                    session, message_id=msg.id, slot_id=slot.id, requester_id=inter.author.id
+        # Одно сообщение на пользователя с кнопкой подтверждения для каждого слота
+        # (в сообщении помещается не больше 25 кнопок)
+        for i in range(0, len(valid_slots), MAX_APPROVE_BUTTONS):
+            chunk = valid_slots[i:i + MAX_APPROVE_BUTTONS]
+            slot_lines = "\n".join(f"`{slot.slot_number}. {slot.role_name}`" for slot in chunk)
+            msg = await thread.send(
+                f"Пользователь {inter.author.mention} подал заявку на слоты:\n{slot_lines}\n"
+                f"Организатор <@{event.owner_id}>, подтвердите запись кнопками ниже.",
+                components=[approve_button(slot) for slot in chunk]
+            )
+            async with transaction("signup.modal") as session:
+                await crud_event.create_signup_requests(
+                    session, message_id=msg.id, slot_ids=[slot.id for slot in chunk],
+                    requester_id=inter.author.id, event_id=event.id, owner_id=event.owner_id
                 )
 
         await inter.followup.send(f"✅ Ваши заявки на слоты: {', '.join(str(s.slot_number) for s in valid_slots)} "
                                   f"отправлены в ветку {thread.mention} на подтверждение.", ephemeral=True)
 
+    async def get_or_create_thread(self, inter: disnake.ModalInteraction, event: Row) -> disnake.Thread:
+        """
+        Создает ветку заявок под блокировкой события: одновременные формы ждут
+        первую и берут созданную ею ветку, а не создают каждая свою.
+        """
+        async with event_locks.hold(event.id):
+            # Пока ждали блокировку, ветку мог создать другой обработчик или процесс:
+            # запись ветки сбрасывает снимок события, поэтому он покажет новую ветку
+            snapshot = await event_snapshot_loader.get(event.id)
+            thread = inter.channel.get_thread(snapshot.header.thread_id) if snapshot else None
+            if thread:
+                return thread
+            message = await inter.channel.fetch_message(event.message_id)
+            thread = await message.create_thread(name=f"Заявки на '{event.title}'")
+            async with transaction("signup.modal") as session:
+                await crud_event.update_event_thread_id(session, event.id, thread.id)
+            return thread
+
 
 class SignupView(disnake.ui.View):
     def __init__(self):
         super().__init__(timeout=None)
 
+    # Кнопка старых анонсов, созданных до появления ID события в custom_id
     @disnake.ui.button(label="Записаться", style=disnake.ButtonStyle.success, custom_id="signup_button")
+    @timed("button:signup_legacy")
     async def signup_button(self, button: disnake.ui.Button, inter: disnake.MessageInteraction):
         event_id_str = inter.message.embeds[0].footer.text.split(" | ")[0].replace("ID события: ", "")
-        
-        async with async_session_maker() as session:
-            event = await crud_event.get_event_by_id(session, int(event_id_str))
-            if not event:
-                await inter.followup.send("Не удалось найти это событие. Возможно, оно было удалено.", ephemeral=True)
-                return
-        
-        modal = SignupModal(event)
-        await inter.response.send_modal(modal)
+        await inter.response.send_modal(SignupModal(int(event_id_str)))
 
 # --- Основной ког ---
 
@@ -146,6 +177,88 @@ class EventCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.view_added = False
+        self.notifier = SubscriberNotifier(
+            bot, workers=int(os.getenv("NOTIFY_WORKERS", "5")), queue_size=int(os.getenv("NOTIFY_QUEUE_SIZE", "1000"))
+        )
+        self.notify_chunk_size = int(os.getenv("NOTIFY_CHUNK_SIZE", "1000"))
+        # Изменения слотов одного события в пределах окна дают одно редактирование анонса
+        self.embed_refresher = KeyedDebouncer(
+            float(os.getenv("EMBED_REFRESH_DELAY", "1.5")), self.refresh_event_embed
+        )
+        # Повторы редактирования анонса после 5xx и 429: счетчик попыток по событию
+        self.embed_refresh_attempts = int(os.getenv("EMBED_REFRESH_ATTEMPTS", "5"))
+        self._refresh_failures: dict[int, int] = {}
+        # Сообщения анонсов для редактирования без запроса канала; размер как у кэша отрисовки
+        self._event_messages = TTLCache(maxsize=event_embeds.renderer.maxsize, ttl=24 * 3600)
+        # Шарды распределены по нескольким процессам: заявки создают и другие процессы,
+        # а фоновые задачи над всей БД выполняет только процесс с шардом 0
+        shard_ids = getattr(bot, "shard_ids", None)
+        signup_index.authoritative = not shard_ids or len(shard_ids) >= (bot.shard_count or 1)
+        # Без шины оповещений версии событий не знают о записях других процессов
+        event_embeds.renderer.trusted = signup_index.authoritative or not isinstance(bus.backend, LocalBackend)
+        event_snapshots.trusted = event_embeds.renderer.trusted
+        self.is_leader = not shard_ids or 0 in shard_ids
+        self.reminders = ReminderScheduler(
+            bot, self.notifier,
+            lead_time=float(os.getenv("REMINDER_LEAD_MINUTES", "30")) * 60,
+            horizon=float(os.getenv("REMINDER_HORIZON_HOURS", "6")) * 3600,
+        )
+        # Прошедшие события старше RETENTION_DAYS дней переносятся в архив; 0 отключает задачу
+        self.retention = RetentionJob(
+            retention_days=float(os.getenv("RETENTION_DAYS", "30")),
+            interval=float(os.getenv("RETENTION_INTERVAL_HOURS", "24")) * 3600,
+            batch_size=int(os.getenv("RETENTION_BATCH_SIZE", "500")),
+        )
+
+    def cog_unload(self):
+        self.notifier.stop()
+        self.reminders.stop()
+        self.retention.stop()
+        self.embed_refresher.cancel_all()
+
+    async def refresh_event_embed(self, event_id: int):
+        """
+        Перерисовывает анонс события по актуальному состоянию из БД. Чтение и
+        отрисовка идут под блокировкой события, а редактирование сообщения —
+        уже после нее, чтобы ожидание Discord (в том числе при 429) не задерживало
+        подтверждения заявок. Перерисовки одного события в процессе и так идут
+        по очереди через embed_refresher, поэтому последней уходит самая свежая.
+        """
+        try:
+            async with event_locks.hold(event_id):
+                version = event_versions.version(event_id)
+                async with session_scope("event.refresh_embed") as session:
+                    event = await crud_event.get_event_by_id(session, event_id)
+                if not event or not event.message_id:
+                    self._refresh_failures.pop(event_id, None)
+                    return
+
+                message = self._event_messages.get(event_id)
+                if message is None:
+                    channel = self.bot.get_channel(event.channel_id) or await self.bot.fetch_channel(event.channel_id)
+                    message = channel.get_partial_message(event.message_id)
+                    self._event_messages.set(event_id, message)
+                embed = format_event_embed(event, message.guild, version)
+            await message.edit(embed=embed)
+        except (disnake.NotFound, disnake.Forbidden) as e:
+            self._event_messages.pop(event_id)
+            print(f"Не удалось обновить сообщение для события {event_id}: {e}")
+        except disnake.HTTPException as e:
+            # Сбой на стороне Discord или лимит запросов: перерисовка повторится
+            # через окно embed_refresher, но не больше EMBED_REFRESH_ATTEMPTS раз
+            # подряд. Прочие ответы 4xx не исправит повтор
+            print(f"Ошибка Discord при обновлении сообщения события {event_id}: {e}")
+            if e.status >= 500 or e.status == 429:
+                failures = self._refresh_failures.get(event_id, 0) + 1
+                if failures < self.embed_refresh_attempts:
+                    self._refresh_failures[event_id] = failures
+                    self.embed_refresher.mark_dirty(event_id)
+                    return
+                print(
+                    f"Предупреждение: анонс события {event_id} не обновлен за {failures} попыток, "
+                    f"повторы прекращены до следующего изменения."
+                )
+        self._refresh_failures.pop(event_id, None)
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -154,6 +267,68 @@ class EventCog(commands.Cog):
             self.bot.add_view(SignupView())
             self.view_added = True
             print("Persistent view 'SignupView' has been added.")
+        if not signup_index.loaded:
+            async with session_scope("event.on_ready") as session:
+                count = await crud_event.load_signup_index(session)
+            print(f"Индекс заявок загружен: {count} активных заявок.")
+        self.reminders.start()
+        if self.is_leader:
+            self.retention.start()
+
+    @commands.Cog.listener("on_button_click")
+    async def on_button_click(self, inter: disnake.MessageInteraction):
+        """Разбирает custom_id кнопок записи и подтверждения."""
+        custom_id = inter.component.custom_id or ""
+        if custom_id.startswith(SIGNUP_BUTTON_PREFIX):
+            await self.open_signup_modal(inter, int(custom_id[len(SIGNUP_BUTTON_PREFIX):]))
+        elif custom_id.startswith(APPROVE_BUTTON_PREFIX):
+            await self.approve_signup(inter, int(custom_id[len(APPROVE_BUTTON_PREFIX):]))
+
+    @timed("button:signup")
+    async def open_signup_modal(self, inter: disnake.MessageInteraction, event_id: int):
+        """Открывает форму записи сразу, без обращения к БД."""
+        await inter.response.send_modal(SignupModal(event_id))
+
+    @timed("button:approve")
+    async def approve_signup(self, inter: disnake.MessageInteraction, slot_id: int):
+        """Подтверждает заявку на один слот из сообщения с заявками."""
+        custom_id = inter.component.custom_id
+
+        entries = signup_index.lookup(inter.message.id)
+        entry = entries.get(slot_id) if entries else None
+        if entry is not None and inter.author.id != entry.owner_id:
+            await inter.response.send_message("Подтверждать заявки может только организатор события.", ephemeral=True)
+            return
+
+        if entry is not None:
+            async with event_locks.hold(entry.event_id), transaction("signup.approve") as session:
+                slot = await crud_event.claim_slot_by_request(session, inter.message.id, inter.author.id, slot_id)
+        else:
+            # Без записи в индексе событие неизвестно до UPDATE; занять слот дважды
+            # не дает сам UPDATE, который проверяет, что слот свободен
+            async with transaction("signup.approve") as session:
+                slot = await crud_event.claim_slot_by_request(session, inter.message.id, inter.author.id, slot_id)
+        if not slot:
+            await inter.response.send_message(
+                "❌ Не удалось подтвердить заявку: слот уже занят или вы не организатор события.", ephemeral=True
+            )
+            return
+
+        self.embed_refresher.mark_dirty(slot.event_id)
+
+        # Убираем кнопку одобренного слота, остальные заявки из сообщения остаются
+        remaining = [
+            component
+            for row in inter.message.components
+            for component in row.children
+            if component.custom_id != custom_id
+        ]
+        await inter.response.edit_message(
+            content=f"{inter.message.content}\n✅ Слот `{slot.slot_number}. {slot.role_name}` **одобрен**.",
+            components=[
+                disnake.ui.Button.from_component(component) for component in remaining
+            ]
+        )
 
     @commands.slash_command(name="event", description="Команды для управления событиями")
     async def event(self, inter: disnake.ApplicationCommandInteraction):
@@ -170,115 +345,122 @@ class EventCog(commands.Cog):
         roles: str = commands.Param(default=None, description="Роли, разделенные '|', если не используется шаблон")
     ):
         await inter.response.defer(ephemeral=True)
-        async with async_session_maker() as session:
-            user = await crud_user.get_or_create_user(session, inter.author.id, inter.author.name)
-            if user.bot_role not in [BotRole.EVENT_CREATOR, BotRole.ADMIN]:
-                await inter.followup.send("У вас нет прав для создания событий.", ephemeral=True)
-                return
+        if not template and not roles:
+            await inter.followup.send("Нужно указать либо шаблон, либо перечень ролей.", ephemeral=True)
+            return
+        if template and roles:
+            await inter.followup.send("Нельзя одновременно использовать и шаблон, и ручной ввод ролей.", ephemeral=True)
+            return
+        role_list = [] if template else [r.strip() for r in roles.split('|') if r.strip()]
+        if not template and not role_list:
+            await inter.followup.send("Не удалось определить список ролей.", ephemeral=True)
+            return
+        timestamp = parse_datetime(date_time)
+        if not timestamp:
+            await inter.followup.send("Неверный формат времени и даты. Используйте 'ЧЧ:ММ ДД.ММ' или 'ЧЧ:ММ ДД.ММ.ГГГГ'.", ephemeral=True)
+            return
 
-            if not template and not roles:
-                await inter.followup.send("Нужно указать либо шаблон, либо перечень ролей.", ephemeral=True)
-                return
-            if template and roles:
-                await inter.followup.send("Нельзя одновременно использовать и шаблон, и ручной ввод ролей.", ephemeral=True)
-                return
-                
-            role_list = []
-            if template:
-                db_template = await crud_template.get_template_by_name(session, inter.guild.id, template)
-                if not db_template:
-                    await inter.followup.send(f"Шаблон '{template}' не найден.", ephemeral=True)
-                    return
-                role_list = [r.role_name for r in db_template.roles]
-            else:
-                role_list = [r.strip() for r in roles.split('|') if r.strip()]
+        # Ответ об ошибке отправляется после выхода из транзакции
+        error = None
+        async with transaction("event.create") as session:
+            role = await crud_user.get_user_role(session, inter.author.id, inter.author.name)
+            if role not in [BotRole.EVENT_CREATOR, BotRole.ADMIN]:
+                error = "У вас нет прав для создания событий."
+            elif template:
+                role_list = await crud_template.get_template_role_names(session, inter.guild.id, template)
+                if not role_list:
+                    error = f"Шаблон '{template}' не найден."
 
-            if not role_list:
-                await inter.followup.send("Не удалось определить список ролей.", ephemeral=True)
-                return
+            if error is None:
+                new_event = await crud_event.create_event_with_slots(
+                    session, owner_id=inter.author.id, title=title, description=description,
+                    event_timestamp=timestamp, role_names=role_list
+                )
 
-            timestamp = parse_datetime(date_time)
-            if not timestamp:
-                await inter.followup.send("Неверный формат времени и даты. Используйте 'ЧЧ:ММ ДД.ММ' или 'ЧЧ:ММ ДД.ММ.ГГГГ'.", ephemeral=True)
-                return
-            
-            new_event = await crud_event.create_event_with_slots(
-                session, owner_id=inter.author.id, title=title, description=description,
-                event_timestamp=timestamp, role_names=role_list
-            )
-            
-            embed = format_event_embed(new_event, inter.guild)
-            msg = await inter.channel.send(embed=embed, view=SignupView())
-            await crud_event.update_event_message_info(session, new_event.id, msg.id, inter.channel.id)
-            await inter.followup.send(f"Событие '{title}' успешно создано!", ephemeral=True)
-
-            # Рассылка уведомлений подписчикам
-            subscriber_ids = await crud_subscription.get_creator_subscribers(session, inter.author.id)
-            if not subscriber_ids:
-                return
+                embed = format_event_embed(new_event, inter.guild, event_versions.version(new_event.id))
+                # Событие фиксируется до отправки анонса, чтобы соединение не ждало REST
+                await release(session)
+                msg = await inter.channel.send(embed=embed, components=signup_button(new_event.id))
+                await crud_event.update_event_message_info(session, new_event.id, msg.id, inter.channel.id)
 
-            notification_text = f"Создатель событий {inter.author.mention} анонсировал новое событие в канале {inter.channel.mention}!"
-            notification_embed = format_event_embed(new_event, inter.guild)
-            success_count = 0
-            for user_id in subscriber_ids:
-                if user_id == inter.author.id:
-                    continue
-                try:
-                    user_to_dm = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
-                    await user_to_dm.send(notification_text, embed=notification_embed)
-                    success_count += 1
-                except disnake.Forbidden:
-                    print(f"Не удалось отправить ЛС пользователю {user_id}: личные сообщения заблокированы.")
-                except Exception as e:
-                    print(f"Произошла ошибка при отправке ЛС пользователю {user_id}: {e}")
-            
-            if success_count > 0:
-                print(f"Уведомления о событии #{new_event.id} разосланы {success_count} подписчикам.")
+        if error is not None:
+            await inter.followup.send(error, ephemeral=True)
+            return
+
+        self.reminders.schedule(new_event.id, timestamp)
+        await inter.followup.send(f"Событие '{title}' успешно создано!", ephemeral=True)
+
+        # Рассылка уведомлений подписчикам уходит в фоновые воркеры, подписчики читаются пачками
+        notification_text = f"Создатель событий {inter.author.mention} анонсировал новое событие в канале {inter.channel.mention}!"
+        self.notifier.submit(new_event.id, self.subscriber_chunks(inter.author.id), notification_text, embed=embed)
+
+    async def subscriber_chunks(self, creator_id: int):
+        """
+        Подписчики создателя пачками по NOTIFY_CHUNK_SIZE, без самого создателя.
+        Каждая пачка читается в своей сессии: пока рассылка разбирает пачку,
+        соединение не удерживается.
+        """
+        after = 0
+        while True:
+            async with session_scope("event.notify_subscribers") as session:
+                chunk = await crud_subscription.get_creator_subscribers_page(
+                    session, creator_id, after, self.notify_chunk_size
+                )
+            if chunk:
+                yield [user_id for user_id in chunk if user_id != creator_id]
+            if len(chunk) < self.notify_chunk_size:
+                return
+            after = chunk[-1]
 
 
     @commands.Cog.listener("on_raw_reaction_add")
+    @timed("listener:on_raw_reaction_add")
     async def on_raw_reaction_add(self, payload: disnake.RawReactionActionEvent):
         
         if payload.user_id == self.bot.user.id or str(payload.emoji) != "✅":
             return
 
-        async with async_session_maker() as session:
-            request = await crud_event.get_signup_request(session, payload.message_id)
-            if not request:
+        # Посторонние реакции отбрасываются по индексу в памяти, без запроса к БД.
+        # Реакциями подтверждаются только старые заявки: один слот на сообщение
+        entries = signup_index.lookup(payload.message_id)
+        if entries is None and signup_index.loaded:
+            if signup_index.authoritative:
                 return
-            
-            slot_result = await session.get(EventSlot, request.slot_id)
-            if not slot_result: return
-            event = await session.get(Event, slot_result.event_id)
-            if not event: return
-
-            # Проверяем, что реакцию поставил организатор события
-            if payload.user_id != event.owner_id:
+            # Заявку мог создать процесс с другими шардами
+            async with session_scope("event.on_raw_reaction_add") as session:
+                entries = await crud_event.get_signup_entries(session, payload.message_id)
+            if entries is None:
                 return
-            
-            # Проверяем, свободен ли еще слот
-            if slot_result.signed_up_user_id is not None:
+        slot_id = None
+        if entries is not None:
+            if len(entries) != 1:
+                return
+            slot_id, entry = next(iter(entries.items()))
+            if payload.user_id != entry.owner_id:
                 return
 
-            await crud_event.assign_user_to_slot(session, request.slot_id, request.requester_id)
-            updated_event = await crud_event.get_event_by_id(session, event.id)
-            
-            try:
-                channel = self.bot.get_channel(updated_event.channel_id) or await self.bot.fetch_channel(updated_event.channel_id)
-                message = await channel.fetch_message(updated_event.message_id)
-                new_embed = format_event_embed(updated_event, payload.member.guild)
-                await message.edit(embed=new_embed)
-            except (disnake.NotFound, disnake.Forbidden) as e:
-                print(f"Не удалось обновить сообщение для события {updated_event.id}: {e}")
-
-            try:
-                thread = self.bot.get_channel(updated_event.thread_id) or await self.bot.fetch_channel(updated_event.thread_id)
-                request_message = await thread.fetch_message(request.request_message_id)
-                await request_message.edit(content=f"✅ Заявка от <@{request.requester_id}> на слот "
-                                                    f"`{slot_result.slot_number}. {slot_result.role_name}` **одобрена**.")
-                await request_message.clear_reactions()
-            except (disnake.NotFound, disnake.Forbidden) as e:
-                print(f"Не удалось обновить сообщение в ветке для события {updated_event.id}: {e}")
+        if entries is not None:
+            async with event_locks.hold(entry.event_id), transaction("event.on_raw_reaction_add") as session:
+                # Проверка организатора, свободного слота и запись — одним запросом
+                slot = await crud_event.claim_slot_by_request(session, payload.message_id, payload.user_id, slot_id)
+        else:
+            # Индекс еще не загружен: событие неизвестно до UPDATE, который сам не
+            # дает занять слот дважды
+            async with transaction("event.on_raw_reaction_add") as session:
+                slot = await crud_event.claim_slot_by_request(session, payload.message_id, payload.user_id, slot_id)
+        if not slot:
+            return
+
+        self.embed_refresher.mark_dirty(slot.event_id)
+
+        try:
+            thread = self.bot.get_channel(payload.channel_id) or await self.bot.fetch_channel(payload.channel_id)
+            request_message = thread.get_partial_message(payload.message_id)
+            await request_message.edit(content=f"✅ Заявка от <@{slot.signed_up_user_id}> на слот "
+                                                f"`{slot.slot_number}. {slot.role_name}` **одобрена**.")
+            await request_message.clear_reactions()
+        except (disnake.NotFound, disnake.Forbidden) as e:
+            print(f"Не удалось обновить сообщение в ветке для события {slot.event_id}: {e}")
 
 def setup(bot: commands.Bot):
     bot.add_cog(EventCog(bot))
\ No newline at end of file
@@ -1,19 +1,14 @@
 import disnake
 from disnake.ext import commands
-from sqlalchemy.exc import IntegrityError
 
-from database.session import async_session_maker
-from database.models import User, BotRole
+from database.session import session_scope, transaction
+from database.models import BotRole
 from database.crud import crud_subscription, crud_user
 
 # --- Функция автодополнения для поиска ивент-креаторов ---
 async def autocomplete_event_creators(inter: disnake.ApplicationCommandInteraction, user_input: str):
-    async with async_session_maker() as session:
-        creators = await crud_subscription.get_all_creators(session)
-        return [
-            creator.username for creator in creators 
-            if user_input.lower() in creator.username.lower()
-        ]
+    async with session_scope("subscription.autocomplete") as session:
+        return await crud_subscription.search_creators(session, user_input, limit=25)
 
 class SubscriptionCog(commands.Cog):
     def __init__(self, bot):
@@ -30,26 +25,29 @@ class SubscriptionCog(commands.Cog):
         creator: disnake.User = commands.Param(description="Пользователь, на которого вы хотите подписаться")
     ):
         await inter.response.defer(ephemeral=True)
-        async with async_session_maker() as session:
-            target_user = await crud_user.get_or_create_user(session, creator.id, creator.name)
-            if target_user.bot_role != [BotRole.EVENT_CREATOR, BotRole.ADMIN]:
-                await inter.followup.send(
-                    f"❌ Нельзя подписаться на {creator.mention}, так как он не является создателем событий.",
-                    ephemeral=False
-                )
-                return
-            
-            try:
-                await crud_subscription.add_subscription(session, inter.author.id, creator.id)
-                await inter.followup.send(
-                    f"✅ Вы успешно подписались на уведомления от {creator.mention}!",
-                    ephemeral=False
-                )
-            except IntegrityError: # Эта ошибка возникнет, если подписка уже существует
-                await inter.followup.send(
-                    f"Вы уже подписаны на {creator.mention}.",
-                    ephemeral=False
-                )
+        async with transaction("subscription.subscribe") as session:
+            target_role = await crud_user.get_user_role(session, creator.id, creator.name)
+            added = None
+            if target_role in [BotRole.EVENT_CREATOR, BotRole.ADMIN]:
+                # Подписка ссылается на users: подписчик мог еще ни разу не попасть в БД
+                await crud_user.get_or_create_user(session, inter.author.id, inter.author.name)
+                added = await crud_subscription.add_subscription(session, inter.author.id, creator.id)
+
+        if added is None:
+            await inter.followup.send(
+                f"❌ Нельзя подписаться на {creator.mention}, так как он не является создателем событий.",
+                ephemeral=False
+            )
+        elif added:
+            await inter.followup.send(
+                f"✅ Вы успешно подписались на уведомления от {creator.mention}!",
+                ephemeral=False
+            )
+        else:
+            await inter.followup.send(
+                f"Вы уже подписаны на {creator.mention}.",
+                ephemeral=False
+            )
     
     @subscription.sub_command(name="unsubscribe", description="Отписаться от уведомлений создателя событий")
     async def unsubscribe(
@@ -58,24 +56,24 @@ class SubscriptionCog(commands.Cog):
         creator: disnake.User = commands.Param(description="Пользователь, от которого вы хотите отписаться")
     ):
         await inter.response.defer(ephemeral=True)
-        async with async_session_maker() as session:
+        async with transaction("subscription.unsubscribe") as session:
             success = await crud_subscription.remove_subscription(session, inter.author.id, creator.id)
-            if success:
-                await inter.followup.send(
-                    f"🗑️ Вы отписались от уведомлений {creator.mention}.",
-                    ephemeral=False
-                )
-            else:
-                await inter.followup.send(
-                    f"Вы не были подписаны на {creator.mention}.",
-                    ephemeral=False
-                )
+        if success:
+            await inter.followup.send(
+                f"🗑️ Вы отписались от уведомлений {creator.mention}.",
+                ephemeral=False
+            )
+        else:
+            await inter.followup.send(
+                f"Вы не были подписаны на {creator.mention}.",
+                ephemeral=False
+            )
 
     @subscription.sub_command(name="list", description="Показать список ваших подписок")
     async def list_subscriptions(self, inter: disnake.ApplicationCommandInteraction):
         await inter.response.defer(ephemeral=True)
 
-        async with async_session_maker() as session:
+        async with session_scope("subscription.list") as session:
             subscriptions = await crud_subscription.get_user_subscriptions(session, inter.author.id)
 
         if not subscriptions:
@@ -87,7 +85,7 @@ class SubscriptionCog(commands.Cog):
             description="Вы получаете уведомления о новых событиях от следующих пользователей:",
             color=disnake.Color.blurple()
         )
-        sub_list = [f"- <@{user.user_id}>" for user in subscriptions]
+        sub_list = [f"- <@{creator_id}>" for creator_id in subscriptions]
         embed.add_field(name="Создатели событий", value="\n".join(sub_list))
         await inter.followup.send(embed=embed, ephemeral=False)
 
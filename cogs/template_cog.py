@@ -2,14 +2,14 @@ import disnake
 from disnake.ext import commands
 from sqlalchemy.exc import IntegrityError
 
-from database.session import async_session_maker
+from database.session import session_scope, transaction
 from database.crud import crud_template
 
 # Функция для автодополнения
 async def autocomplete_template_name(inter: disnake.ApplicationCommandInteraction, user_input: str):
-    async with async_session_maker() as session:
-        templates = await crud_template.get_all_templates_for_guild(session, inter.guild.id)
-        return [t.name for t in templates if user_input.lower() in t.name.lower()]
+    async with session_scope("template.autocomplete") as session:
+        # Discord принимает не больше 25 вариантов
+        return await crud_template.search_template_names(session, inter.guild.id, user_input, limit=25)
 
 class TemplateCog(commands.Cog):
     def __init__(self, bot):
@@ -31,22 +31,23 @@ class TemplateCog(commands.Cog):
             await inter.followup.send("Вы не указали ни одной роли!", ephemeral=True)
             return
 
-        async with async_session_maker() as session:
-            try:
+        try:
+            async with transaction("template.create") as session:
                 await crud_template.create_template_with_roles(
                     session, guild_id=inter.guild.id, name=name, role_names=role_list
                 )
-                await inter.followup.send(
-                    f"✅ Шаблон **{name}** успешно создан!", ephemeral=True
-                )
-            except IntegrityError:
-                await inter.followup.send(
-                    f"❌ Шаблон с именем **{name}** уже существует на этом сервере.", ephemeral=True
-                )
+        except IntegrityError:
+            await inter.followup.send(
+                f"❌ Шаблон с именем **{name}** уже существует на этом сервере.", ephemeral=True
+            )
+            return
+        await inter.followup.send(
+            f"✅ Шаблон **{name}** успешно создан!", ephemeral=True
+        )
 
     @template.sub_command(name="list", description="Показать все шаблоны на сервере")
     async def list(self, inter: disnake.ApplicationCommandInteraction):
-        async with async_session_maker() as session:
+        async with session_scope("template.list") as session:
             templates = await crud_template.get_all_templates_for_guild(session, inter.guild.id)
         
         if not templates:
@@ -71,7 +72,7 @@ class TemplateCog(commands.Cog):
         name: str = commands.Param(description="Название шаблона для удаления", autocomplete=autocomplete_template_name)
     ):
         
-        async with async_session_maker() as session:
+        async with transaction("template.delete") as session:
             success = await crud_template.delete_template(session, inter.guild.id, name)
         
         if success:
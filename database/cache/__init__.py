@@ -0,0 +1,47 @@
+# Кэши и индексы в памяти процесса, которые поддерживает слой database/crud
+import os
+
+from .event_snapshots import EventSnapshot, EventSnapshotCache
+from .event_versions import EventVersions
+from .signup_index import SignupEntry, SignupRequestIndex
+from .template_index import TemplateNameIndex
+from .user_cache import CachedUser
+from utils.ttl_cache import TTLCache
+from ..invalidation import LocalBackend, bus
+
+signup_index = SignupRequestIndex()
+template_name_index = TemplateNameIndex()
+# Версии событий для кэша отрисовки анонсов: растут при изменении слотов
+event_versions = EventVersions()
+# Снимки событий (поля и слоты) для всплесков записи на одно событие, сверяются с event_versions
+event_snapshots = EventSnapshotCache(ttl=float(os.getenv("EVENT_SNAPSHOT_TTL", "2")))
+# Результаты поиска создателей для автодополнения, ключ — (строка запроса, лимит)
+creator_search_cache = TTLCache(maxsize=512, ttl=30.0)
+# Горячий кэш пользователей для проверки прав: user_id -> CachedUser.
+# Роль могут сменить в другом процессе: при шардировании по процессам (задан
+# SHARD_IDS) без шины оповещений запись живет недолго
+_short_user_ttl = os.getenv("SHARD_IDS") and isinstance(bus.backend, LocalBackend)
+user_cache = TTLCache(maxsize=10_000, ttl=float(os.getenv("USER_CACHE_TTL", "60" if _short_user_ttl else "3600")))
+
+
+# Сброс записей по оповещениям об изменениях из других процессов
+def _evict_user(user_id: str) -> None:
+    user_cache.pop(int(user_id))
+    # Смена роли меняет и список создателей событий
+    creator_search_cache.clear()
+
+
+def _reset_all() -> None:
+    user_cache.clear()
+    creator_search_cache.clear()
+    template_name_index.clear()
+    event_versions.invalidate_all()
+    event_snapshots.clear()
+
+
+bus.on("user", _evict_user)
+bus.on("template", lambda guild_id: template_name_index.invalidate(int(guild_id)))
+bus.on("slot", lambda slot_id: signup_index.discard_slot(int(slot_id)))
+bus.on("slot", lambda slot_id: event_versions.bump_slot(int(slot_id)))
+bus.on("event", lambda event_id: event_snapshots.invalidate(int(event_id)))
+bus.on_reset(_reset_all)
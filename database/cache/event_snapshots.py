@@ -0,0 +1,57 @@
+from dataclasses import dataclass
+from typing import Sequence
+
+from sqlalchemy import Row
+
+from utils.ttl_cache import TTLCache
+
+
+@dataclass(frozen=True)
+class EventSnapshot:
+    """Поля события и все его слоты на момент загрузки, без объектов сессии."""
+    version: int
+    header: Row
+    slots: tuple[Row, ...]
+
+    def free_slots(self, slot_numbers: Sequence[int]) -> list[Row]:
+        """Свободные слоты с указанными номерами, по возрастанию номера."""
+        wanted = set(slot_numbers)
+        return [slot for slot in self.slots if slot.slot_number in wanted and slot.signed_up_user_id is None]
+
+
+class EventSnapshotCache:
+    """
+    Короткоживущие снимки событий для обработчиков записи.
+
+    Снимок действителен, пока не истек ttl и версия события в event_versions
+    не изменилась: занятие слота повышает версию, и следующий читатель
+    загружает событие заново. Если изменения слотов могут приходить мимо
+    event_versions (несколько процессов без шины оповещений), trusted = False
+    и снимки не выдаются.
+    """
+
+    def __init__(self, ttl: float = 2.0, maxsize: int = 1024):
+        self.trusted = True
+        self._snapshots = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, event_id: int, version: int) -> EventSnapshot | None:
+        snapshot = self._snapshots.get(event_id) if self.trusted else None
+        if snapshot is None or snapshot.version != version:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return snapshot
+
+    def set(self, event_id: int, snapshot: EventSnapshot) -> None:
+        self._snapshots.set(event_id, snapshot)
+
+    def invalidate(self, event_id: int) -> None:
+        self._snapshots.pop(event_id)
+
+    def clear(self) -> None:
+        self._snapshots.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"size": len(self._snapshots), "hits": self.hits, "misses": self.misses}
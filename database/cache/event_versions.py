@@ -0,0 +1,62 @@
+from typing import Iterable
+
+# Сколько последних изменений слотов помнится на событие; более старые
+# читатели получают None и перестраивают все заново
+MAX_CHANGES = 64
+
+
+class EventVersions:
+    """
+    Версии событий для кэша отрисовки анонсов.
+
+    Версия события растет при каждом изменении его слотов, а журнал хранит,
+    какие слоты менялись, чтобы читатель со старой версией перестроил только их.
+    Изменение события целиком (slot_id = None) требует полной перестройки.
+    """
+
+    def __init__(self):
+        # event_id -> (версия первой записи журнала, ID измененных слотов)
+        self._logs: dict[int, tuple[int, list[int | None]]] = {}
+        self._slot_events: dict[int, int] = {}
+
+    def version(self, event_id: int) -> int:
+        log = self._logs.get(event_id)
+        return log[0] + len(log[1]) if log else 0
+
+    def bump(self, event_id: int, slot_id: int | None = None) -> None:
+        base, changes = self._logs.setdefault(event_id, (0, []))
+        changes.append(slot_id)
+        if len(changes) > MAX_CHANGES:
+            self._logs[event_id] = (base + len(changes) - MAX_CHANGES, changes[-MAX_CHANGES:])
+
+    def track(self, event_id: int, slot_ids: Iterable[int]) -> None:
+        """Запоминает слоты события, чтобы изменения по ID слота находили свое событие."""
+        for slot_id in slot_ids:
+            self._slot_events[slot_id] = event_id
+
+    def bump_slot(self, slot_id: int) -> None:
+        """Повышает версию события по ID слота; слоты неизвестных событий пропускаются."""
+        event_id = self._slot_events.get(slot_id)
+        if event_id is not None:
+            self.bump(event_id, slot_id)
+
+    def changes_since(self, event_id: int, version: int) -> set[int] | None:
+        """ID слотов, измененных после version, или None, если нужна полная перестройка."""
+        base, changes = self._logs.get(event_id, (0, []))
+        if version < base:
+            return None
+        changed = changes[version - base:]
+        if None in changed:
+            return None
+        return set(changed)
+
+    def forget(self, event_id: int, slot_ids: Iterable[int] = ()) -> None:
+        """Удаляет журнал и слоты события, когда его отрисовка вытеснена из кэша."""
+        self._logs.pop(event_id, None)
+        for slot_id in slot_ids:
+            self._slot_events.pop(slot_id, None)
+
+    def invalidate_all(self) -> None:
+        """Требует полной перестройки всех известных событий (часть изменений могла потеряться)."""
+        for event_id in {*self._logs, *self._slot_events.values()}:
+            self.bump(event_id)
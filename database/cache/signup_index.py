@@ -0,0 +1,65 @@
+from typing import Iterable, NamedTuple
+
+
+class SignupEntry(NamedTuple):
+    slot_id: int
+    event_id: int
+    owner_id: int
+    requester_id: int
+
+
+class SignupRequestIndex:
+    """
+    Индекс актуальных запросов на запись в памяти процесса:
+    ID сообщения-заявки -> заявленные в нем слоты, событие и организатор.
+
+    Позволяет отбросить реакцию на постороннее сообщение без обращения к БД.
+    Пока индекс не загружен (loaded = False), промах не считается
+    окончательным и вызывающий код должен проверить БД. То же верно, когда
+    заявки создают и другие процессы (authoritative = False, шардированный режим).
+    """
+
+    def __init__(self):
+        self._by_message: dict[int, dict[int, SignupEntry]] = {}
+        self._by_slot: dict[int, set[int]] = {}
+        self.loaded = False
+        self.authoritative = True
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._by_message)
+
+    def load(self, entries: Iterable[tuple[int, SignupEntry]]) -> None:
+        """Полностью пересобирает индекс из пар (ID сообщения, запись)."""
+        self._by_message.clear()
+        self._by_slot.clear()
+        for message_id, entry in entries:
+            self.add(message_id, entry)
+        self.loaded = True
+
+    def add(self, message_id: int, entry: SignupEntry) -> None:
+        self._by_message.setdefault(message_id, {})[entry.slot_id] = entry
+        self._by_slot.setdefault(entry.slot_id, set()).add(message_id)
+
+    def lookup(self, message_id: int) -> dict[int, SignupEntry] | None:
+        """Возвращает заявки сообщения в виде {ID слота: запись} или None."""
+        entries = self._by_message.get(message_id)
+        if entries is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entries
+
+    def discard_slot(self, slot_id: int) -> None:
+        """Удаляет все заявки на слот (например, после того как слот занят)."""
+        for message_id in self._by_slot.pop(slot_id, ()):
+            entries = self._by_message.get(message_id)
+            if entries is None:
+                continue
+            entries.pop(slot_id, None)
+            if not entries:
+                del self._by_message[message_id]
+
+    def stats(self) -> dict[str, int]:
+        return {"size": len(self), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,48 @@
+from bisect import bisect_left
+from typing import Iterable
+
+from utils.ttl_cache import TTLCache
+
+
+class TemplateNameIndex:
+    """
+    Отсортированный индекс имен шаблонов по серверам для автодополнения.
+
+    Поиск по префиксу идет бинарным поиском, совпадения по подстроке
+    добираются, только если префиксных не хватило до лимита.
+    """
+
+    def __init__(self, ttl: float = 300.0, maxsize: int = 1024):
+        self._guilds = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def is_cached(self, guild_id: int) -> bool:
+        return self._guilds.get(guild_id) is not None
+
+    def set(self, guild_id: int, names: Iterable[str]) -> None:
+        self._guilds.set(guild_id, sorted((name.lower(), name) for name in names))
+
+    def invalidate(self, guild_id: int) -> None:
+        self._guilds.pop(guild_id)
+
+    def clear(self) -> None:
+        self._guilds.clear()
+
+    def search(self, guild_id: int, user_input: str, limit: int = 25) -> list[str] | None:
+        """Возвращает до limit имен или None, если сервера нет в кэше."""
+        entries = self._guilds.get(guild_id)
+        if entries is None:
+            return None
+
+        query = user_input.lower()
+        results = []
+        i = bisect_left(entries, (query,))
+        while i < len(entries) and len(results) < limit and entries[i][0].startswith(query):
+            results.append(entries[i][1])
+            i += 1
+        if len(results) < limit:
+            for lowered, name in entries:
+                if query in lowered and not lowered.startswith(query):
+                    results.append(name)
+                    if len(results) >= limit:
+                        break
+        return results
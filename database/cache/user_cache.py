@@ -0,0 +1,7 @@
+from typing import NamedTuple
+
+
+class CachedUser(NamedTuple):
+    user_id: int
+    username: str
+    bot_role: str
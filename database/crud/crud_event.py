@@ -1,81 +1,252 @@
 from typing import Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Row, exists, insert, update
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from ..models import Event, EventSlot, SignupRequest
+from ..cache import EventSnapshot, SignupEntry, event_snapshots, event_versions, signup_index
+from ..invalidation import bus
+from ..session import after_commit
+
+# Колонки слота, которые возвращают операции записи (RETURNING в SQLite
+# может ссылаться только на изменяемую таблицу)
+_CLAIM_COLUMNS = (
+    EventSlot.id, EventSlot.event_id, EventSlot.slot_number,
+    EventSlot.role_name, EventSlot.signed_up_user_id,
+)
 
 async def create_event_with_slots(
     session: AsyncSession, owner_id: int, title: str, description: str, 
     event_timestamp: int, role_names: list[str]
 ) -> Event:
-    """Создает событие и все его слоты."""
+    """Создает событие и все его слоты; ID события и слотов доступны сразу после вызова."""
     new_event = Event(
         owner_id=owner_id,
         title=title,
         description=description,
         event_timestamp=event_timestamp
     )
-    new_event.slots = [
-        EventSlot(slot_number=i + 1, role_name=role) 
-        for i, role in enumerate(role_names)
-    ]
     session.add(new_event)
-    await session.commit()
-    await session.refresh(new_event)
+    await session.flush()
+    # Слоты одной пакетной вставкой: flush через relationship вставлял бы их по одному
+    slots = []
+    if role_names:
+        result = await session.scalars(
+            insert(EventSlot).returning(EventSlot),
+            [{"event_id": new_event.id, "slot_number": i + 1, "role_name": role} for i, role in enumerate(role_names)]
+        )
+        slots = sorted(result.all(), key=lambda s: s.slot_number)
+    set_committed_value(new_event, "slots", slots)
     return new_event
 
-async def get_event_by_id(session: AsyncSession, event_id: int) -> Event | None:
-    """Получает событие по его ID, подгружая слоты."""
+async def get_event_by_id(session: AsyncSession, event_id: int, load_slots: bool = True) -> Event | None:
+    """Получает событие по его ID; слоты подгружаются, если load_slots."""
+    query = select(Event).filter_by(id=event_id)
+    if load_slots:
+        query = query.options(selectinload(Event.slots))
+    result = await session.execute(query)
+    return result.scalar_one_or_none()
+
+async def get_event_header(session: AsyncSession, event_id: int) -> Row | None:
+    """Поля события, нужные обработчикам, без слотов и без объекта в сессии."""
     result = await session.execute(
-        select(Event).options(selectinload(Event.slots)).filter_by(id=event_id)
+        select(
+            Event.id, Event.title, Event.owner_id, Event.event_timestamp,
+            Event.message_id, Event.channel_id, Event.thread_id,
+        ).where(Event.id == event_id)
     )
-    return result.scalar_one_or_none()
+    return result.one_or_none()
+
+async def get_event_snapshot(session: AsyncSession, event_id: int) -> EventSnapshot | None:
+    """
+    Загружает поля события и все его слоты (id, slot_number, role_name,
+    signed_up_user_id) и кладет снимок в event_snapshots, если версия события
+    не изменилась за время загрузки. None, если события нет.
+    """
+    version = event_versions.version(event_id)
+    header = await get_event_header(session, event_id)
+    if header is None:
+        return None
+    result = await session.execute(
+        select(EventSlot.id, EventSlot.slot_number, EventSlot.role_name, EventSlot.signed_up_user_id)
+        .where(EventSlot.event_id == event_id)
+        .order_by(EventSlot.slot_number)
+    )
+    snapshot = EventSnapshot(version, header, tuple(result.all()))
+    # Занятия слотов из других процессов приходят по шине с ID слота
+    event_versions.track(event_id, (slot.id for slot in snapshot.slots))
+    if event_versions.version(event_id) == version:
+        event_snapshots.set(event_id, snapshot)
+    return snapshot
 
 async def update_event_message_info(
     session: AsyncSession, event_id: int, message_id: int, channel_id: int
 ) -> None:
     """Обновляет ID сообщения и канала для события."""
-    event = await get_event_by_id(session, event_id)
-    if event:
-        event.message_id = message_id
-        event.channel_id = channel_id
-        await session.commit()
+    await session.execute(
+        update(Event).where(Event.id == event_id).values(message_id=message_id, channel_id=channel_id)
+    )
 
 async def update_event_thread_id(session: AsyncSession, event_id: int, thread_id: int) -> None:
-    """Обновляет ID ветки для события."""
-    event = await get_event_by_id(session, event_id)
-    if event:
-        event.thread_id = thread_id
-        await session.commit()
-
-async def create_signup_request(
-    session: AsyncSession, message_id: int, slot_id: int, requester_id: int
-) -> SignupRequest:
-    """Создает запрос на запись в ветке."""
-    request = SignupRequest(
-        request_message_id=message_id, 
-        slot_id=slot_id, 
-        requester_id=requester_id
+    """
+    Обновляет ID ветки для события. Версия события повышается, чтобы снимки
+    и загрузки, начатые до записи, не выдали читателям старую ветку.
+    """
+    await session.execute(update(Event).where(Event.id == event_id).values(thread_id=thread_id))
+    await bus.publish(session, "event", event_id)
+    after_commit(session, lambda: event_versions.bump(event_id))
+
+async def create_signup_requests(
+    session: AsyncSession, message_id: int, slot_ids: list[int], requester_id: int,
+    event_id: int, owner_id: int
+) -> None:
+    """Создает заявки на несколько слотов из одного сообщения одним INSERT и после коммита добавляет их в индекс."""
+    await session.execute(
+        insert(SignupRequest).values([
+            {"request_message_id": message_id, "slot_id": slot_id, "requester_id": requester_id}
+            for slot_id in slot_ids
+        ])
     )
-    session.add(request)
-    await session.commit()
-    return request
 
-async def get_signup_request(session: AsyncSession, message_id: int) -> SignupRequest | None:
-    """Получает запрос на запись по ID его сообщения."""
+    def index_requests():
+        for slot_id in slot_ids:
+            signup_index.add(message_id, SignupEntry(slot_id, event_id, owner_id, requester_id))
+
+    after_commit(session, index_requests)
+
+async def load_signup_index(session: AsyncSession) -> int:
+    """Загружает в индекс все заявки на еще свободные слоты. Возвращает их количество."""
+    result = await session.execute(
+        select(
+            SignupRequest.request_message_id, SignupRequest.slot_id, EventSlot.event_id,
+            Event.owner_id, SignupRequest.requester_id
+        )
+        .join(EventSlot, EventSlot.id == SignupRequest.slot_id)
+        .join(Event, Event.id == EventSlot.event_id)
+        .where(EventSlot.signed_up_user_id.is_(None))
+    )
+    signup_index.load((row[0], SignupEntry(*row[1:])) for row in result)
+    return len(signup_index)
+
+async def get_signup_entries(session: AsyncSession, message_id: int) -> dict[int, SignupEntry] | None:
+    """
+    Читает из БД заявки сообщения на свободные слоты и добавляет их в индекс.
+    Нужен, когда заявку мог создать другой процесс. Возвращает {ID слота: запись} или None.
+    """
+    result = await session.execute(
+        select(SignupRequest.slot_id, EventSlot.event_id, Event.owner_id, SignupRequest.requester_id)
+        .join(EventSlot, EventSlot.id == SignupRequest.slot_id)
+        .join(Event, Event.id == EventSlot.event_id)
+        .where(SignupRequest.request_message_id == message_id, EventSlot.signed_up_user_id.is_(None))
+    )
+    entries = {row.slot_id: SignupEntry(*row) for row in result}
+    for entry in entries.values():
+        signup_index.add(message_id, entry)
+    return entries or None
+
+async def get_signup_requests(session: AsyncSession, message_id: int) -> Sequence[SignupRequest]:
+    """Получает все запросы на запись из сообщения по его ID."""
     result = await session.execute(
         select(SignupRequest).filter_by(request_message_id=message_id)
     )
-    return result.scalar_one_or_none()
+    return result.scalars().all()
+
+async def _slot_claimed(session: AsyncSession, slot: Row) -> None:
+    """Оповещает другие процессы и после коммита обновляет индекс заявок и версию события."""
+    await bus.publish(session, "slot", slot.id)
+
+    def update_caches():
+        signup_index.discard_slot(slot.id)
+        event_versions.bump(slot.event_id, slot.id)
+
+    after_commit(session, update_caches)
 
-async def assign_user_to_slot(session: AsyncSession, slot_id: int, user_id: int) -> EventSlot | None:
-    """Записывает пользователя на слот."""
+async def assign_user_to_slot(session: AsyncSession, slot_id: int, user_id: int) -> Row | None:
+    """Записывает пользователя на слот, если он еще свободен. Возвращает данные слота или None."""
     result = await session.execute(
-        select(EventSlot).filter_by(id=slot_id)
+        update(EventSlot)
+        .where(EventSlot.id == slot_id, EventSlot.signed_up_user_id.is_(None))
+        .values(signed_up_user_id=user_id)
+        .returning(*_CLAIM_COLUMNS)
     )
-    slot = result.scalar_one_or_none()
+    slot = result.one_or_none()
     if slot:
-        slot.signed_up_user_id = user_id
-        await session.commit()
-        await session.refresh(slot)
-    return slot
\ No newline at end of file
+        await _slot_claimed(session, slot)
+    return slot
+
+async def claim_slot_by_request(
+    session: AsyncSession, message_id: int, approver_id: int, slot_id: int | None = None
+) -> Row | None:
+    """
+    Одобряет запрос на запись одним UPDATE: проверка организатора, проверка
+    свободного слота и запись пользователя выполняются атомарно.
+    slot_id выбирает слот, если в сообщении заявлено несколько. Без slot_id
+    слот занимается, только если свободный слот в заявке единственный.
+    Возвращает данные занятого слота или None, если одобрить нельзя.
+    """
+    conditions = [
+        SignupRequest.request_message_id == message_id,
+        EventSlot.id == SignupRequest.slot_id,
+        Event.id == EventSlot.event_id,
+        Event.owner_id == approver_id,
+        EventSlot.signed_up_user_id.is_(None),
+    ]
+    if slot_id is not None:
+        conditions.append(SignupRequest.slot_id == slot_id)
+    else:
+        # Иначе UPDATE занял бы все свободные слоты заявки сразу
+        other_request, other_slot = aliased(SignupRequest), aliased(EventSlot)
+        conditions.append(~exists().where(
+            other_request.request_message_id == message_id,
+            other_request.slot_id != SignupRequest.slot_id,
+            other_slot.id == other_request.slot_id,
+            other_slot.signed_up_user_id.is_(None),
+        ))
+    result = await session.execute(
+        update(EventSlot)
+        .where(*conditions)
+        .values(signed_up_user_id=SignupRequest.requester_id)
+        .returning(*_CLAIM_COLUMNS)
+    )
+    slot = result.one_or_none()
+    if slot:
+        await _slot_claimed(session, slot)
+    return slot
+
+async def get_upcoming_reminders(session: AsyncSession, start: int, end: int) -> Sequence[Row]:
+    """Возвращает (id, event_timestamp) событий в интервале (start, end] без отправленного напоминания."""
+    result = await session.execute(
+        select(Event.id, Event.event_timestamp)
+        .where(
+            Event.event_timestamp > start,
+            Event.event_timestamp <= end,
+            Event.reminded_at.is_(None),
+        )
+        .order_by(Event.event_timestamp)
+    )
+    return result.all()
+
+async def claim_event_reminder(
+    session: AsyncSession, event_id: int, now: int
+) -> tuple[Row, list[int]] | None:
+    """
+    Помечает напоминание о событии отправленным, если его еще никто не отправил.
+    Возвращает данные события и ID записанных участников или None, если
+    напоминание уже забрал другой процесс.
+    """
+    result = await session.execute(
+        update(Event)
+        .where(Event.id == event_id, Event.reminded_at.is_(None))
+        .values(reminded_at=now)
+        .returning(Event.id, Event.title, Event.event_timestamp, Event.channel_id, Event.thread_id)
+    )
+    event = result.one_or_none()
+    if event is None:
+        return None
+    holders = await session.execute(
+        select(EventSlot.signed_up_user_id)
+        .where(EventSlot.event_id == event_id, EventSlot.signed_up_user_id.is_not(None))
+    )
+    user_ids = list(holders.scalars())
+    return event, user_ids
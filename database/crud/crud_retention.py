@@ -0,0 +1,97 @@
+from collections import defaultdict
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, func, insert, text, tuple_
+from sqlalchemy.future import select
+from ..models import ArchivedEvent, Event, EventSlot, SignupRequest
+from ..cache import signup_index
+from ..session import after_commit
+
+async def archive_past_events(session: AsyncSession, before: int, batch_size: int, now: int) -> tuple[int, int]:
+    """
+    Переносит до batch_size самых старых событий, начавшихся раньше before,
+    вместе со слотами в archived_events и удаляет их заявки. Одна транзакция
+    на пачку (коммитит вызывающий). Возвращает количество перенесенных событий и слотов.
+    """
+    events = (await session.execute(
+        select(
+            Event.id, Event.message_id, Event.channel_id, Event.thread_id, Event.owner_id,
+            Event.title, Event.description, Event.event_timestamp
+        )
+        .where(Event.event_timestamp < before)
+        .order_by(Event.event_timestamp)
+        .limit(batch_size)
+    )).all()
+    if not events:
+        return 0, 0
+    event_ids = [event.id for event in events]
+
+    slots = (await session.execute(
+        select(EventSlot.id, EventSlot.event_id, EventSlot.slot_number, EventSlot.role_name, EventSlot.signed_up_user_id)
+        .where(EventSlot.event_id.in_(event_ids))
+        .order_by(EventSlot.event_id, EventSlot.slot_number)
+    )).all()
+    slots_by_event = defaultdict(list)
+    for slot in slots:
+        slots_by_event[slot.event_id].append([slot.slot_number, slot.role_name, slot.signed_up_user_id])
+
+    await session.execute(insert(ArchivedEvent), [
+        {**event._asdict(), "slots": slots_by_event[event.id], "archived_at": now} for event in events
+    ])
+    batch_slots = select(EventSlot.id).where(EventSlot.event_id.in_(event_ids))
+    await session.execute(delete(SignupRequest).where(SignupRequest.slot_id.in_(batch_slots)))
+    await session.execute(delete(EventSlot).where(EventSlot.event_id.in_(event_ids)))
+    await session.execute(delete(Event).where(Event.id.in_(event_ids)))
+
+    def discard_slots():
+        for slot in slots:
+            signup_index.discard_slot(slot.id)
+
+    after_commit(session, discard_slots)
+    return len(events), len(slots)
+
+async def delete_resolved_signup_requests(
+    session: AsyncSession, batch_size: int, after: tuple[int, int] = (0, 0)
+) -> tuple[int, tuple[int, int] | None]:
+    """
+    Удаляет заявки на занятые или удаленные слоты среди следующих batch_size
+    заявок после ключа after (ID сообщения, ID слота). Возвращает число
+    удаленных строк и ключ, с которого продолжать (None, когда заявки закончились).
+    """
+    key = tuple_(SignupRequest.request_message_id, SignupRequest.slot_id)
+    last = (await session.execute(
+        select(SignupRequest.request_message_id, SignupRequest.slot_id)
+        .where(key > tuple_(*after))
+        .order_by(SignupRequest.request_message_id, SignupRequest.slot_id)
+        .offset(batch_size - 1)
+        .limit(1)
+    )).one_or_none()
+
+    free_slot = select(EventSlot.id).where(
+        EventSlot.id == SignupRequest.slot_id, EventSlot.signed_up_user_id.is_(None)
+    )
+    conditions = [key > tuple_(*after), ~free_slot.exists()]
+    if last is not None:
+        conditions.append(key <= tuple_(*last))
+    result = await session.execute(delete(SignupRequest).where(*conditions))
+    return result.rowcount, tuple(last) if last is not None else None
+
+async def get_table_sizes(session: AsyncSession) -> dict[str, int]:
+    """
+    Количество строк в таблицах, которые чистит задача хранения. На PostgreSQL
+    берется оценка планировщика из pg_class (обновляется autovacuum и ANALYZE),
+    чтобы отчет не просматривал таблицы целиком на каждом проходе.
+    """
+    tables = [model.__tablename__ for model in (Event, EventSlot, SignupRequest, ArchivedEvent)]
+    if session.get_bind().dialect.name == "postgresql":
+        rows = (await session.execute(
+            text("SELECT relname, reltuples FROM pg_class WHERE relkind = 'r' AND relname = ANY(:tables)"),
+            {"tables": tables}
+        )).all()
+        # reltuples = -1, пока таблицу ни разу не анализировали
+        estimates = {row.relname: max(int(row.reltuples), 0) for row in rows}
+        return {table: estimates.get(table, 0) for table in tables}
+    sizes = {}
+    for model in (Event, EventSlot, SignupRequest, ArchivedEvent):
+        sizes[model.__tablename__] = await session.scalar(select(func.count()).select_from(model))
+    return sizes
@@ -1,15 +1,14 @@
-from typing import Sequence
+from typing import Iterable, Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import delete
+from sqlalchemy import and_, delete, func
 from ..models import Subscription, User, BotRole
+from ..cache import creator_search_cache
+from .dialect import upsert
 
-async def add_subscription(session: AsyncSession, subscriber_id: int, creator_id: int) -> Subscription:
-    """Добавляет новую подписку в БД."""
-    new_sub = Subscription(subscriber_id=subscriber_id, creator_id=creator_id)
-    session.add(new_sub)
-    await session.commit()
-    return new_sub
+async def add_subscription(session: AsyncSession, subscriber_id: int, creator_id: int) -> bool:
+    """Добавляет подписку. Возвращает False, если она уже есть."""
+    return await add_subscriptions(session, subscriber_id, [creator_id]) > 0
 
 async def remove_subscription(session: AsyncSession, subscriber_id: int, creator_id: int) -> bool:
     """Удаляет подписку из БД."""
@@ -18,25 +17,99 @@ async def remove_subscription(session: AsyncSession, subscriber_id: int, creator
         Subscription.creator_id == creator_id
     )
     result = await session.execute(query)
-    await session.commit()
     return result.rowcount > 0
 
-async def get_user_subscriptions(session: AsyncSession, subscriber_id: int) -> Sequence[User]:
-    """Получает список создателей, на которых подписан пользователь."""
-    query = select(User).join(Subscription, User.user_id == Subscription.creator_id).where(
-        Subscription.subscriber_id == subscriber_id
+async def add_subscriptions(session: AsyncSession, subscriber_id: int, creator_ids: Iterable[int]) -> int:
+    """
+    Подписывает пользователя на нескольких создателей одним INSERT.
+    Существующие подписки пропускаются. Возвращает число новых подписок.
+    """
+    creator_ids = set(creator_ids)
+    if not creator_ids:
+        return 0
+    result = await session.execute(
+        upsert(session)(Subscription)
+        .values([{"subscriber_id": subscriber_id, "creator_id": creator_id} for creator_id in creator_ids])
+        .on_conflict_do_nothing()
+        .returning(Subscription.creator_id)
     )
+    return len(result.scalars().all())
+
+async def remove_subscriptions(session: AsyncSession, subscriber_id: int, creator_ids: Iterable[int]) -> int:
+    """Отписывает пользователя от нескольких создателей одним DELETE. Возвращает число удаленных подписок."""
+    creator_ids = set(creator_ids)
+    if not creator_ids:
+        return 0
+    result = await session.execute(
+        delete(Subscription)
+        .where(Subscription.subscriber_id == subscriber_id, Subscription.creator_id.in_(creator_ids))
+        .returning(Subscription.creator_id)
+    )
+    return len(result.scalars().all())
+
+async def get_user_subscriptions(session: AsyncSession, subscriber_id: int) -> Sequence[int]:
+    """Получает ID создателей, на которых подписан пользователь."""
+    query = select(Subscription.creator_id).where(Subscription.subscriber_id == subscriber_id)
     result = await session.execute(query)
     return result.scalars().all()
 
 async def get_creator_subscribers(session: AsyncSession, creator_id: int) -> Sequence[int]:
-    """Получает список ID пользователей, подписанных на создателя."""
+    """
+    Получает список ID пользователей, подписанных на создателя, целиком.
+    Для рассылок по большим спискам — get_creator_subscribers_page.
+    """
     query = select(Subscription.subscriber_id).where(Subscription.creator_id == creator_id)
     result = await session.execute(query)
     return result.scalars().all()
 
+async def get_creator_subscribers_page(
+    session: AsyncSession, creator_id: int, after: int = 0, limit: int = 1000
+) -> Sequence[int]:
+    """
+    Страница подписчиков создателя с ID больше after по возрастанию (keyset-пагинация
+    по индексу (creator_id, subscriber_id): каждая страница — короткий поиск по индексу).
+    """
+    query = (
+        select(Subscription.subscriber_id)
+        .where(Subscription.creator_id == creator_id, Subscription.subscriber_id > after)
+        .order_by(Subscription.subscriber_id)
+        .limit(limit)
+    )
+    result = await session.execute(query)
+    return result.scalars().all()
+
 async def get_all_creators(session: AsyncSession) -> Sequence[User]:
     """Получает список всех пользователей с ролью 'event_creator'."""
     query = select(User).where(User.bot_role == BotRole.EVENT_CREATOR)
     result = await session.execute(query)
-    return result.scalars().all()
\ No newline at end of file
+    return result.scalars().all()
+
+async def search_creators(session: AsyncSession, user_input: str, limit: int = 25) -> Sequence[str]:
+    """
+    Ищет имена создателей событий по подстроке без учета регистра.
+    Совпадения по префиксу идут первыми: если их хватает до limit, поиск
+    подстроки не выполняется. Результаты кратко кэшируются по запросу.
+    """
+    query_text = user_input.lower()
+    cached = creator_search_cache.get((query_text, limit))
+    if cached is not None:
+        return cached
+
+    escaped = query_text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    username = func.lower(User.username)
+    # Совпадения по префиксу ищутся по индексу ix_users_username_lower. SQLite
+    # применяет индекс к LIKE только по столбцу, поэтому там префикс задан и диапазоном
+    prefix = username.like(f"{escaped}%", escape="\\")
+    if session.get_bind().dialect.name == "sqlite":
+        prefix = and_(prefix, username >= query_text, username < query_text + "\U0010ffff")
+    creators = select(User.username).where(User.bot_role == BotRole.EVENT_CREATOR).order_by(User.username)
+    names = list((await session.execute(creators.where(prefix).limit(limit))).scalars())
+    # Подстрока в середине имени не ищется по индексу: запрос только добирает до limit
+    if query_text and len(names) < limit:
+        names += (await session.execute(
+            creators
+            .where(username.like(f"%{escaped}%", escape="\\"), ~username.like(f"{escaped}%", escape="\\"))
+            .limit(limit - len(names))
+        )).scalars()
+    creator_search_cache.set((query_text, limit), names)
+    return names
@@ -1,39 +1,85 @@
 from typing import Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from ..models import Template, TemplateRole
+from ..cache import template_name_index
+from ..invalidation import bus
+from ..session import after_commit
 
 async def create_template_with_roles(
     session: AsyncSession, guild_id: int, name: str, role_names: list[str]
 ) -> Template:
-    """Создает шаблон с набором ролей."""
+    """Создает шаблон с набором ролей. Повтор имени на сервере дает IntegrityError сразу, при flush."""
     new_template = Template(guild_id=guild_id, name=name)
-    new_template.roles = [TemplateRole(role_name=r) for r in role_names]
-    
     session.add(new_template)
-    await session.commit()
-    await session.refresh(new_template)
+    await session.flush()
+    roles = []
+    if role_names:
+        result = await session.scalars(
+            insert(TemplateRole).returning(TemplateRole),
+            [{"template_id": new_template.id, "role_name": r} for r in role_names]
+        )
+        roles = sorted(result.all(), key=lambda r: r.id)
+    set_committed_value(new_template, "roles", roles)
+    await bus.publish(session, "template", guild_id)
+    after_commit(session, lambda: template_name_index.invalidate(guild_id))
     return new_template
 
-async def get_template_by_name(session: AsyncSession, guild_id: int, name: str) -> Template | None:
-    """Находит шаблон по имени на конкретном сервере."""
+async def get_template_by_name(
+    session: AsyncSession, guild_id: int, name: str, load_roles: bool = False
+) -> Template | None:
+    """Находит шаблон по имени на конкретном сервере; роли подгружаются, только если load_roles."""
+    query = select(Template).where(Template.guild_id == guild_id, Template.name == name)
+    if load_roles:
+        query = query.options(selectinload(Template.roles))
+    result = await session.execute(query)
+    return result.scalar_one_or_none()
+
+async def get_template_role_names(session: AsyncSession, guild_id: int, name: str) -> list[str] | None:
+    """Имена ролей шаблона по порядку одним запросом, без загрузки объектов. None, если шаблона нет."""
     result = await session.execute(
-        select(Template).where(Template.guild_id == guild_id, Template.name == name)
+        select(TemplateRole.role_name)
+        .join(Template, Template.id == TemplateRole.template_id)
+        .where(Template.guild_id == guild_id, Template.name == name)
+        .order_by(TemplateRole.id)
     )
-    return result.scalar_one_or_none()
+    return list(result.scalars()) or None
 
 async def get_all_templates_for_guild(session: AsyncSession, guild_id: int) -> Sequence[Template]:
-    """Возвращает все шаблоны для указанного сервера."""
+    """Возвращает все шаблоны для указанного сервера вместе с ролями."""
+    result = await session.execute(
+        select(Template)
+        .options(selectinload(Template.roles))
+        .where(Template.guild_id == guild_id)
+        .order_by(Template.name)
+    )
+    return result.scalars().all()
+
+async def get_template_names(session: AsyncSession, guild_id: int) -> Sequence[str]:
+    """Возвращает только имена шаблонов сервера, без загрузки ролей."""
     result = await session.execute(
-        select(Template).where(Template.guild_id == guild_id).order_by(Template.name)
+        select(Template.name).where(Template.guild_id == guild_id).order_by(Template.name)
     )
     return result.scalars().all()
 
+async def search_template_names(
+    session: AsyncSession, guild_id: int, user_input: str, limit: int = 25
+) -> list[str]:
+    """Ищет имена шаблонов для автодополнения через кэшированный индекс сервера."""
+    if not template_name_index.is_cached(guild_id):
+        template_name_index.set(guild_id, await get_template_names(session, guild_id))
+    return template_name_index.search(guild_id, user_input, limit) or []
+
 async def delete_template(session: AsyncSession, guild_id: int, name: str) -> bool:
-    """Удаляет шаблон по имени."""
-    template = await get_template_by_name(session, guild_id, name)
-    if template:
-        await session.delete(template)
-        await session.commit()
-        return True
-    return False
\ No newline at end of file
+    """Удаляет шаблон по имени вместе с ролями, без загрузки объектов в сессию."""
+    template_ids = select(Template.id).where(Template.guild_id == guild_id, Template.name == name)
+    await session.execute(delete(TemplateRole).where(TemplateRole.template_id.in_(template_ids)))
+    result = await session.execute(delete(Template).where(Template.guild_id == guild_id, Template.name == name))
+    if not result.rowcount:
+        return False
+    await bus.publish(session, "template", guild_id)
+    after_commit(session, lambda: template_name_index.invalidate(guild_id))
+    return True
\ No newline at end of file
@@ -1,26 +1,40 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 from ..models import User
+from ..cache import CachedUser, creator_search_cache, user_cache
+from ..invalidation import bus
+from ..session import after_commit
+from .dialect import upsert
 
 async def get_or_create_user(session: AsyncSession, user_id: int, username: str) -> User:
-    """Получает пользователя из БД или создает нового, если его нет."""
-    result = await session.execute(select(User).filter_by(user_id=user_id))
-    user = result.scalar_one_or_none()
-
-    if user is None:
-        user = User(user_id=user_id, username=username)
-        session.add(user)
-        await session.commit()
-        await session.refresh(user)
-    elif user.username != username:
-        user.username = username
-        await session.commit()
-        
+    """Получает пользователя из БД или создает нового, если его нет (один INSERT ... ON CONFLICT)."""
+    stmt = upsert(session)(User).values(user_id=user_id, username=username)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[User.user_id], set_={"username": stmt.excluded.username}
+    ).returning(User)
+    result = await session.execute(stmt, execution_options={"populate_existing": True})
+    user = result.scalar_one()
+    cached = CachedUser(user.user_id, user.username, user.bot_role)
+    after_commit(session, lambda: user_cache.set(user_id, cached))
     return user
 
+async def get_user_role(session: AsyncSession, user_id: int, username: str) -> str:
+    """Возвращает роль пользователя, обычно из кэша и без запросов к БД."""
+    cached = user_cache.get(user_id)
+    if cached is not None and cached.username == username:
+        return cached.bot_role
+    user = await get_or_create_user(session, user_id, username)
+    return user.bot_role
+
 async def set_user_role(session: AsyncSession, user: User, role: str) -> User:
     """Устанавливает роль пользователю."""
     user.bot_role = role
-    await session.commit()
-    await session.refresh(user)
-    return user
\ No newline at end of file
+    await session.flush()
+    await bus.publish(session, "user", user.user_id)
+    user_id = user.user_id
+
+    def evict():
+        user_cache.pop(user_id)
+        creator_search_cache.clear()
+
+    after_commit(session, evict)
+    return user
@@ -0,0 +1,149 @@
+import asyncio
+import os
+import time
+import uuid
+from collections import defaultdict
+from typing import Callable
+
+from sqlalchemy import func, make_url, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from dotenv import load_dotenv
+
+from utils.metrics import histogram
+
+load_dotenv()
+
+CHANNEL = "bot_cache_invalidation"
+# Идентификатор процесса: свои оповещения процесс пропускает, его кэши уже обновил crud
+ORIGIN = uuid.uuid4().hex[:8]
+
+invalidation_lag = histogram(
+    "cache_invalidation_lag_seconds", "Задержка от коммита до сброса кэша в другом процессе", label_name="kind"
+)
+
+
+class LocalBackend:
+    """Один процесс: кэши обновляет сам слой crud, рассылать нечего."""
+
+    async def publish(self, session: AsyncSession, payload: str) -> None:
+        pass
+
+    async def start(self, bus: "InvalidationBus") -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+class PostgresBackend:
+    """
+    Оповещения через LISTEN/NOTIFY. pg_notify выполняется в транзакции записи,
+    поэтому оповещение уходит только при коммите и никогда — при откате.
+    Сессии других БД (например, SQLite в инструментах с --url) не оповещают.
+    Слушает отдельное соединение вне пула; после разрыва соединения все
+    кэши сбрасываются, так как оповещения за это время потеряны.
+    """
+
+    def __init__(self, url: str, reconnect_delay: float = 1.0):
+        self.dsn = make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.reconnect_delay = reconnect_delay
+        self._task: asyncio.Task | None = None
+
+    async def publish(self, session: AsyncSession, payload: str) -> None:
+        if session.get_bind().dialect.name == "postgresql":
+            await session.execute(select(func.pg_notify(CHANNEL, payload)))
+
+    async def start(self, bus: "InvalidationBus") -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen(bus), name="cache-invalidation")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _listen(self, bus: "InvalidationBus") -> None:
+        import asyncpg
+
+        connected_before = False
+        while True:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+            except (OSError, asyncpg.PostgresError) as e:
+                print(f"Шина инвалидации: не удалось подключиться к БД: {e}")
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+
+            closed = asyncio.Event()
+            connection.add_termination_listener(lambda _: closed.set())
+            await connection.add_listener(CHANNEL, lambda _conn, _pid, _channel, payload: bus.dispatch(payload))
+            if connected_before:
+                bus.reset()
+            connected_before = True
+            try:
+                await closed.wait()
+            finally:
+                if not connection.is_closed():
+                    await connection.close()
+            print("Шина инвалидации: соединение потеряно, переподключение.")
+            await asyncio.sleep(self.reconnect_delay)
+
+
+class InvalidationBus:
+    """
+    Оповещения об изменениях, после которых другие процессы сбрасывают кэши.
+
+    crud вызывает publish(session, вид, ключ) до коммита записи; процессы,
+    подписанные через on(вид, обработчик), получают ключ и удаляют
+    затронутые записи своих кэшей. Формат оповещения: "вид:ключ:процесс:мс".
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._handlers: dict[str, list[Callable[[str], None]]] = defaultdict(list)
+        self._reset_handlers: list[Callable[[], None]] = []
+        self.received = 0
+
+    def on(self, kind: str, handler: Callable[[str], None]) -> None:
+        self._handlers[kind].append(handler)
+
+    def on_reset(self, handler: Callable[[], None]) -> None:
+        """Обработчик полного сброса кэша, когда часть оповещений могла потеряться."""
+        self._reset_handlers.append(handler)
+
+    async def publish(self, session: AsyncSession, kind: str, key: object) -> None:
+        await self.backend.publish(session, f"{kind}:{key}:{ORIGIN}:{int(time.time() * 1000)}")
+
+    def dispatch(self, payload: str) -> None:
+        kind, key, origin, sent_at = payload.split(":")
+        if origin == ORIGIN:
+            return
+        self.received += 1
+        for handler in self._handlers.get(kind, ()):
+            handler(key)
+        invalidation_lag.observe(max(0.0, time.time() - int(sent_at) / 1000), kind)
+
+    def reset(self) -> None:
+        for handler in self._reset_handlers:
+            handler()
+
+    async def start(self) -> None:
+        await self.backend.start(self)
+
+    async def stop(self) -> None:
+        await self.backend.stop()
+
+
+def _backend_from_env():
+    """
+    INVALIDATION_BACKEND=local|postgres; по умолчанию postgres, если шарды
+    распределены по процессам (задан SHARD_IDS) и база — PostgreSQL.
+    """
+    url = os.getenv("DATABASE_URL", "")
+    default = "postgres" if url.startswith("postgresql") and os.getenv("SHARD_IDS") else "local"
+    if (os.getenv("INVALIDATION_BACKEND") or default) == "postgres":
+        return PostgresBackend(url)
+    return LocalBackend()
+
+
+bus = InvalidationBus(_backend_from_env())
@@ -0,0 +1,91 @@
+import asyncio
+import hashlib
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Hashable
+
+from sqlalchemy import make_url
+from dotenv import load_dotenv
+
+from utils.locks import KeyedLocks
+
+load_dotenv()
+
+
+def advisory_key(name: str, key: Hashable) -> int:
+    """Стабильный между процессами 64-битный ключ advisory-блокировки для имени и ключа."""
+    digest = hashlib.blake2b(f"{name}:{key}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class PostgresAdvisoryLocks:
+    """
+    Межпроцессные блокировки через pg_try_advisory_lock на отдельном
+    соединении asyncpg вне пула: ни ожидание, ни сама критическая секция
+    (в том числе вызовы REST внутри нее) не занимают соединений пула.
+    Запросы к соединению идут по очереди, поэтому занятый ключ ожидается
+    опросом с нарастающей паузой, а не блокирующим pg_advisory_lock.
+    При обрыве соединения PostgreSQL снимает все его блокировки; следующий
+    захват откроет новое соединение.
+    """
+
+    def __init__(self, url: str, poll_interval: float = 0.01, max_poll_interval: float = 0.2):
+        self.dsn = make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self._connection = None
+        self._guard = asyncio.Lock()
+
+    async def _fetch(self, query: str, lock_id: int):
+        import asyncpg
+
+        async with self._guard:
+            if self._connection is None or self._connection.is_closed():
+                self._connection = await asyncpg.connect(self.dsn)
+            return self._connection, await self._connection.fetchval(query, lock_id)
+
+    @asynccontextmanager
+    async def hold(self, name: str, key: Hashable) -> AsyncIterator[None]:
+        lock_id = advisory_key(name, key)
+        delay = self.poll_interval
+        while True:
+            connection, acquired = await self._fetch("SELECT pg_try_advisory_lock($1)", lock_id)
+            if acquired:
+                break
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_poll_interval)
+        try:
+            yield
+        finally:
+            if connection.is_closed() or connection is not self._connection:
+                print(f"Блокировка {name}:{key} снята вместе с разорванным соединением.")
+            else:
+                import asyncpg
+
+                try:
+                    await self._fetch("SELECT pg_advisory_unlock($1)", lock_id)
+                except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                    # Соединение оборвалось: PostgreSQL уже снял его блокировки
+                    print(f"Не удалось снять блокировку {name}:{key}: {e}")
+
+    async def close(self) -> None:
+        async with self._guard:
+            if self._connection is not None and not self._connection.is_closed():
+                await self._connection.close()
+            self._connection = None
+
+
+def _backend_from_env():
+    """
+    LOCK_BACKEND=local|postgres; по умолчанию postgres, если шарды
+    распределены по процессам (задан SHARD_IDS) и база — PostgreSQL.
+    """
+    url = os.getenv("DATABASE_URL", "")
+    default = "postgres" if url.startswith("postgresql") and os.getenv("SHARD_IDS") else "local"
+    if (os.getenv("LOCK_BACKEND") or default) == "postgres":
+        return PostgresAdvisoryLocks(url)
+    return None
+
+
+# Критические секции одного события: создание ветки заявок, занятие слотов, редактирование анонса
+event_locks = KeyedLocks("event", _backend_from_env())
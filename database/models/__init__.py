@@ -5,4 +5,5 @@ from .template_role_model import TemplateRole
 from .event_model import Event
 from .event_slot_model import EventSlot
 from .signup_request_model import SignupRequest
-from .subscription_model import Subscription
\ No newline at end of file
+from .subscription_model import Subscription
+from .archived_event_model import ArchivedEvent
\ No newline at end of file
@@ -0,0 +1,19 @@
+from sqlalchemy import JSON, BigInteger, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from ..base import Base
+
+class ArchivedEvent(Base):
+    """Прошедшее событие вместе со слотами в одной строке (слоты — JSON-список)."""
+    __tablename__ = "archived_events"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    message_id: Mapped[int] = mapped_column(BigInteger, nullable=True)
+    channel_id: Mapped[int] = mapped_column(BigInteger, nullable=True)
+    thread_id: Mapped[int] = mapped_column(BigInteger, nullable=True)
+    owner_id: Mapped[int] = mapped_column(BigInteger, index=True)
+    title: Mapped[str] = mapped_column(String(255))
+    description: Mapped[str] = mapped_column(Text, nullable=True)
+    event_timestamp: Mapped[int] = mapped_column(BigInteger)
+    # [[slot_number, role_name, signed_up_user_id], ...]
+    slots: Mapped[list] = mapped_column(JSON)
+    archived_at: Mapped[int] = mapped_column(BigInteger)
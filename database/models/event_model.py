@@ -4,17 +4,23 @@ from ..base import Base
 
 class Event(Base):
     __tablename__ = "events"
+    # SQLite без AUTOINCREMENT выдает ID удаленного (перенесенного в архив)
+    # последнего события заново, а archived_events хранит события под их ID
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id: Mapped[int] = mapped_column(primary_key=True)
     message_id: Mapped[int] = mapped_column(BigInteger, unique=True, nullable=True)
     channel_id: Mapped[int] = mapped_column(BigInteger, nullable=True)
     thread_id: Mapped[int] = mapped_column(BigInteger, unique=True, nullable=True)
-    owner_id: Mapped[int] = mapped_column(ForeignKey("users.user_id"))
+    owner_id: Mapped[int] = mapped_column(ForeignKey("users.user_id"), index=True)
     title: Mapped[str] = mapped_column(String(255))
     description: Mapped[str] = mapped_column(Text, nullable=True)
-    event_timestamp: Mapped[int] = mapped_column(BigInteger)
+    event_timestamp: Mapped[int] = mapped_column(BigInteger, index=True)
+    # Unix-время отправки напоминания; заполняется до отправки, чтобы не повторять ее
+    reminded_at: Mapped[int] = mapped_column(BigInteger, nullable=True)
 
     owner: Mapped["User"] = relationship(back_populates="events")
+    # Слоты загружаются только явно (selectinload в запросе); неявная подгрузка — ошибка
     slots: Mapped[list["EventSlot"]] = relationship(
-        back_populates="event", cascade="all, delete-orphan", lazy="selectin"
+        back_populates="event", cascade="all, delete-orphan", lazy="raise_on_sql"
     )
\ No newline at end of file
@@ -6,5 +6,5 @@ class SignupRequest(Base):
     __tablename__ = "signup_requests"
 
     request_message_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
-    slot_id: Mapped[int] = mapped_column(ForeignKey("event_slots.id"))
+    slot_id: Mapped[int] = mapped_column(ForeignKey("event_slots.id"), primary_key=True, index=True)
     requester_id: Mapped[int] = mapped_column(BigInteger)
\ No newline at end of file
@@ -1,5 +1,5 @@
 # database/models/subscription_model.py
-from sqlalchemy import BigInteger, ForeignKey, PrimaryKeyConstraint
+from sqlalchemy import BigInteger, ForeignKey, Index, PrimaryKeyConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 from ..base import Base
 
@@ -11,4 +11,6 @@ class Subscription(Base):
 
     __table_args__ = (
         PrimaryKeyConstraint("subscriber_id", "creator_id"),
+        # Подписчики создателя: поиск по creator_id без обращения к таблице
+        Index("ix_subscriptions_creator_subscriber", "creator_id", "subscriber_id"),
     )
\ No newline at end of file
@@ -9,8 +9,9 @@ class Template(Base):
     guild_id: Mapped[int] = mapped_column(BigInteger)
     name: Mapped[str] = mapped_column(String(100))
 
+    # Роли загружаются только явно (selectinload в запросе); неявная подгрузка — ошибка
     roles: Mapped[list["TemplateRole"]] = relationship(
-        back_populates="template", cascade="all, delete-orphan", lazy="selectin"
+        back_populates="template", cascade="all, delete-orphan", lazy="raise_on_sql"
     )
     
     __table_args__ = (UniqueConstraint("guild_id", "name", name="uq_guild_template_name"),)
\ No newline at end of file
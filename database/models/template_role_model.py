@@ -6,7 +6,7 @@ class TemplateRole(Base):
     __tablename__ = "template_roles"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    template_id: Mapped[int] = mapped_column(ForeignKey("templates.id"))
+    template_id: Mapped[int] = mapped_column(ForeignKey("templates.id"), index=True)
     role_name: Mapped[str] = mapped_column(String(100))
 
     template: Mapped["Template"] = relationship(back_populates="roles")
\ No newline at end of file
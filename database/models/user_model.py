@@ -1,4 +1,4 @@
-from sqlalchemy import BigInteger, String, Integer
+from sqlalchemy import BigInteger, Index, String, Integer, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from ..base import Base
 
@@ -13,7 +13,15 @@ class User(Base):
     user_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
     username: Mapped[str] = mapped_column(String(255))
     balance: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
-    bot_role: Mapped[str] = mapped_column(String(50), default=BotRole.USER, server_default=BotRole.USER, nullable=False)
+    bot_role: Mapped[str] = mapped_column(String(50), default=BotRole.USER, server_default=BotRole.USER, nullable=False, index=True)
     
     # Связь: один пользователь может создать много событий
-    events: Mapped[list["Event"]] = relationship(back_populates="owner")
\ No newline at end of file
+    events: Mapped[list["Event"]] = relationship(back_populates="owner")
+
+    __table_args__ = (
+        # Поиск создателей событий по имени без учета регистра
+        Index(
+            "ix_users_username_lower", func.lower(username).label("username_lower"),
+            postgresql_ops={"username_lower": "text_pattern_ops"}
+        ),
+    )
\ No newline at end of file
@@ -1,7 +1,17 @@
 import os
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Callable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from dotenv import load_dotenv
 
+from utils.metrics import histogram
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -9,5 +19,134 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise Exception("Не найдена переменная DATABASE_URL в .env файле")
 
-async_engine = create_async_engine(DATABASE_URL)
-async_session_maker = async_sessionmaker(async_engine, expire_on_commit=False)
\ No newline at end of file
+# Настройки пула соединений (для SQLite не применяются)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# Кэши подготовленных выражений asyncpg; 0 отключает их (нужно за pgbouncer в режиме transaction)
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+DB_PREPARED_STATEMENT_CACHE_SIZE = int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", "100"))
+# Через сколько секунд удержания соединения обработчиком выводится предупреждение
+DB_LONG_HOLD_WARNING = float(os.getenv("DB_LONG_HOLD_WARNING", "2.0"))
+
+pool_checkout_wait = histogram("db_pool_checkout_wait_seconds", "Ожидание соединения из пула", label_name="handler")
+pool_hold_time = histogram("db_pool_hold_seconds", "Время удержания соединения обработчиком", label_name="handler")
+
+# Имя обработчика, который сейчас работает с БД (для метрик и предупреждений)
+current_handler: ContextVar[str] = ContextVar("current_handler", default="unknown")
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Пул, замеряющий время ожидания свободного соединения."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_checkout_wait.observe(time.perf_counter() - start, current_handler.get())
+
+
+def _engine_options(url: str) -> dict:
+    if url.startswith("sqlite"):
+        return {}
+    options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if "+asyncpg" in url:
+        options["connect_args"] = {
+            "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": DB_PREPARED_STATEMENT_CACHE_SIZE,
+        }
+    return options
+
+
+async_engine = create_async_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+async_session_maker = async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+@event.listens_for(async_engine.sync_engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    connection_record.info["checked_out_at"] = time.perf_counter()
+    connection_record.info["handler"] = current_handler.get()
+
+
+@event.listens_for(async_engine.sync_engine, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    checked_out_at = connection_record.info.pop("checked_out_at", None)
+    handler = connection_record.info.pop("handler", "unknown")
+    if checked_out_at is None:
+        return
+    held = time.perf_counter() - checked_out_at
+    pool_hold_time.observe(held, handler)
+    if held > DB_LONG_HOLD_WARNING:
+        print(f"Обработчик {handler} удерживал соединение с БД {held:.2f} с.")
+
+
+@asynccontextmanager
+async def session_scope(handler: str) -> AsyncIterator[AsyncSession]:
+    """Открывает сессию от имени обработчика, чтобы метрики пула знали, кто держит соединение."""
+    token = current_handler.set(handler)
+    try:
+        async with async_session_maker() as session:
+            yield session
+    finally:
+        current_handler.reset(token)
+
+
+@asynccontextmanager
+async def transaction(handler: str) -> AsyncIterator[AsyncSession]:
+    """
+    Единица работы обработчика: функции database/crud только выполняют flush,
+    а здесь все изменения фиксируются одним коммитом при выходе из блока.
+    При исключении изменения откатываются, а кэши не обновляются.
+    """
+    async with session_scope(handler) as session:
+        yield session
+        await session.commit()
+
+
+async def release(session: AsyncSession) -> None:
+    """
+    Фиксирует сделанное и возвращает соединение в пул, например перед
+    медленным вызовом REST Discord. Следующий запрос сессии начнет новую транзакцию.
+    """
+    await session.commit()
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """Выполняет callback после коммита текущей транзакции сессии; при откате callback отбрасывается."""
+    session.sync_session.info.setdefault("after_commit", []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session) -> None:
+    for callback in session.info.pop("after_commit", ()):
+        callback()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_after_commit(session: Session, transaction) -> None:
+    # Корневая транзакция завершилась без коммита (откат или закрытие сессии)
+    if transaction.parent is None:
+        session.info.pop("after_commit", None)
+
+
+def pool_status() -> dict[str, int]:
+    """Текущее состояние пула: занятые, свободные и сверхлимитные соединения."""
+    pool = async_engine.pool
+    if not isinstance(pool, AsyncAdaptedQueuePool):
+        return {}
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+    }
@@ -1,3 +1,7 @@
+import time
+
+STARTED_AT = time.perf_counter()
+
 import os
 import disnake
 from disnake.ext import commands
@@ -5,32 +9,112 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+from services import startup
+
+# В режиме production коги импортируются параллельно с авторизацией, перезагрузка
+# когов отключена, а команды регистрируются только при изменении их описаний
+PRODUCTION = os.getenv("BOT_MODE", "development").lower() == "production"
+COMMAND_SYNC_CACHE = os.getenv("COMMAND_SYNC_CACHE", ".command_sync_hash")
+COGS = startup.discover_cogs()
+# Шардирование: SHARD_COUNT (число или "auto") включает AutoShardedBot, SHARD_IDS
+# задает шарды этого процесса, чтобы несколько процессов делили одну БД
+SHARD_COUNT = os.getenv("SHARD_COUNT")
+SHARD_IDS = startup.parse_shard_ids(os.getenv("SHARD_IDS"))
+if SHARD_IDS and (not SHARD_COUNT or SHARD_COUNT == "auto"):
+    raise Exception("Для SHARD_IDS нужно указать общее число шардов в SHARD_COUNT")
+# Процесс с шардом 0 регистрирует команды; остальные процессы этого не делают
+IS_LEADER = not SHARD_IDS or 0 in SHARD_IDS
+# Тестовый сервер (TEST_GUILD_ID) для быстрой регистрации команд при разработке;
+# в production и при шардировании команды глобальные
+TEST_GUILDS = (
+    [int(os.getenv("TEST_GUILD_ID"))] if os.getenv("TEST_GUILD_ID") and not PRODUCTION and not SHARD_COUNT else None
+)
+
 # Задаем намерения (intents)
 intents = disnake.Intents.default()
 intents.members = True
 intents.message_content = True # Необходимо для некоторых команд
 
+
+class FastStartMixin:
+    async def login(self, token: str) -> None:
+        if not PRODUCTION:
+            return await super().login(token)
+        login = self.loop.create_task(super().login(token))
+        elapsed = await startup.preload_modules([*startup.DEFERRED_MODULES, *(f"cogs.{name}" for name in COGS)])
+        print(f"Модули импортированы за {elapsed:.2f} с")
+        setup_extensions()
+        await login
+
+
+class Bot(FastStartMixin, commands.Bot):
+    pass
+
+
+class ShardedBot(FastStartMixin, commands.AutoShardedBot):
+    pass
+
+
+if SHARD_COUNT:
+    bot_class = ShardedBot
+    sharding = {"shard_ids": SHARD_IDS, "shard_count": None if SHARD_COUNT == "auto" else int(SHARD_COUNT)}
+else:
+    bot_class = Bot
+    sharding = {}
+
 # Создаем экземпляр бота
-bot = commands.Bot(
+bot = bot_class(
     command_prefix="!", # Префикс для текстовых команд (если понадобятся)
     intents=intents,
-    test_guilds=[int(os.getenv("TEST_GUILD_ID"))], # Сервер для быстрой регистрации команд
-    reload=True # Автоматическая перезагрузка когов при изменении файлов
+    test_guilds=TEST_GUILDS,
+    reload=not PRODUCTION, # Автоматическая перезагрузка когов при изменении файлов
+    command_sync_flags=(
+        commands.CommandSyncFlags.none() if PRODUCTION or not IS_LEADER else commands.CommandSyncFlags.default()
+    ),
+    **sharding,
 )
+metrics_server = None
+ready_reported = False
+
+
+def setup_extensions():
+    from services import instrumentation
+
+    # Замеры команд, SQL-запросов и REST-вызовов
+    instrumentation.install(bot)
+    startup.load_cogs(bot, COGS)
+
+
+@bot.event
+async def on_connect():
+    from database.invalidation import bus
+
+    # Оповещения других процессов об изменениях, после которых сбрасываются кэши
+    await bus.start()
+
 
 @bot.event
 async def on_ready():
+    global metrics_server, ready_reported
+    from services import instrumentation
+
     print(f"Бот {bot.user} запущен и готов к работе!")
     print(f"disnake version: {disnake.__version__}")
+    if not ready_reported:
+        ready_reported = True
+        print(f"Время до готовности: {time.perf_counter() - STARTED_AT:.2f} с")
+        if PRODUCTION and IS_LEADER:
+            await startup.sync_commands_if_changed(bot, COMMAND_SYNC_CACHE)
+    # Метрики в формате Prometheus, если задан порт; процессы с шардами
+    # слушают порт METRICS_PORT + номер первого шарда
+    if os.getenv("METRICS_PORT") and metrics_server is None:
+        metrics_server = await instrumentation.start_metrics_server(
+            os.getenv("METRICS_HOST", "127.0.0.1"), int(os.getenv("METRICS_PORT")) + (SHARD_IDS or [0])[0]
+        )
 
-# Загружаем все файлы .py из папки cogs
-for filename in os.listdir("./cogs"):
-    if filename.endswith(".py") and not filename.startswith("__"):
-        try:
-            bot.load_extension(f"cogs.{filename[:-3]}")
-            print(f"Успешно загружен ког: {filename}")
-        except Exception as e:
-            print(f"Не удалось загрузить ког {filename}: {e}")
+# Загружаем коги сразу; в production это происходит во время авторизации
+if not PRODUCTION:
+    setup_extensions()
 
 if __name__ == "__main__":
-    bot.run(os.getenv("DISCORD_TOKEN"))
\ No newline at end of file
+    bot.run(os.getenv("DISCORD_TOKEN"))
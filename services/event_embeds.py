@@ -0,0 +1,104 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import disnake
+
+from database.cache import event_snapshots, event_versions
+from database.models import Event, EventSlot
+
+
+def format_slot_line(slot: EventSlot) -> str:
+    user_mention = f"<@{slot.signed_up_user_id}>" if slot.signed_up_user_id else "**[Свободно]**"
+    return f"`{slot.slot_number}.` {slot.role_name}: {user_mention}"
+
+
+@dataclass
+class _Render:
+    version: int
+    header: tuple
+    # Строки слотов в порядке номеров и позиция строки по ID слота
+    lines: list[str]
+    positions: dict[int, int]
+    embed: disnake.Embed
+
+
+class EventEmbedRenderer:
+    """
+    Кэш отрисовки анонсов событий по ID события и версии из event_versions.
+
+    Пока версия и заголовок (название, описание, время, организатор) не
+    менялись, возвращается тот же объект Embed — вызывающий код не должен его
+    изменять. После изменения слотов перестраиваются только их строки.
+    version — версия события, прочитанная до загрузки event из БД: отрисовка
+    сохраняется под версией своих данных, а не под текущей, иначе занятие
+    слота между загрузкой и отрисовкой закрепило бы в кэше устаревшие строки.
+    Если изменения слотов могут приходить мимо event_versions (несколько
+    процессов без шины оповещений), trusted = False и строки строятся заново.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.trusted = True
+        self._renders: OrderedDict[int, _Render] = OrderedDict()
+        self.hits = 0
+        self.partial = 0
+        self.full = 0
+
+    def render(self, event: Event, guild: disnake.Guild, version: int) -> disnake.Embed:
+        owner = guild.get_member(event.owner_id)
+        header = (event.title, event.description, event.event_timestamp, owner.display_name if owner else None)
+
+        cached = self._renders.get(event.id) if self.trusted else None
+        if cached is not None and cached.version > version:
+            # Данные старше кэша: отрисовываем их, но не заменяем более новую запись
+            self.full += 1
+            slots = sorted(event.slots, key=lambda s: s.slot_number)
+            return self._build(event, header, [format_slot_line(slot) for slot in slots])
+        if cached is not None and len(cached.lines) == len(event.slots):
+            if cached.version == version and cached.header == header:
+                self.hits += 1
+                self._renders.move_to_end(event.id)
+                return cached.embed
+            changed = event_versions.changes_since(event.id, cached.version)
+            if changed is not None and changed <= cached.positions.keys():
+                self.partial += 1
+                lines = cached.lines
+                if changed:
+                    for slot in event.slots:
+                        if slot.id in changed:
+                            lines[cached.positions[slot.id]] = format_slot_line(slot)
+                return self._store(event, header, version, lines, cached.positions)
+
+        self.full += 1
+        slots = sorted(event.slots, key=lambda s: s.slot_number)
+        positions = {slot.id: i for i, slot in enumerate(slots)}
+        event_versions.track(event.id, positions)
+        return self._store(event, header, version, [format_slot_line(slot) for slot in slots], positions)
+
+    def _store(
+        self, event: Event, header: tuple, version: int, lines: list[str], positions: dict[int, int]
+    ) -> disnake.Embed:
+        embed = self._build(event, header, lines)
+        self._renders[event.id] = _Render(version, header, lines, positions, embed)
+        self._renders.move_to_end(event.id)
+        while len(self._renders) > self.maxsize:
+            event_id, evicted = self._renders.popitem(last=False)
+            event_versions.forget(event_id, evicted.positions)
+            # Версия вытесненного события начнется заново, старый снимок мог бы с ней совпасть
+            event_snapshots.invalidate(event_id)
+        return embed
+
+    @staticmethod
+    def _build(event: Event, header: tuple, lines: list[str]) -> disnake.Embed:
+        title, description, timestamp, owner_name = header
+        embed = disnake.Embed(title=f"📅 {title}", description=description, color=disnake.Color.green())
+        embed.add_field(name="Время проведения", value=f"<t:{timestamp}:F> (<t:{timestamp}:R>)", inline=False)
+        embed.add_field(name="Участники", value="\n".join(lines) or "Слоты не определены.", inline=False)
+        embed.set_footer(text=f"ID события: {event.id} | Организатор: {owner_name or 'Неизвестно'}")
+        return embed
+
+    def stats(self) -> dict[str, int]:
+        return {"size": len(self._renders), "hits": self.hits, "partial": self.partial, "full": self.full}
+
+
+renderer = EventEmbedRenderer()
@@ -0,0 +1,38 @@
+from database.cache import EventSnapshot, event_snapshots, event_versions
+from database.crud import crud_event
+from database.session import session_scope
+from utils.singleflight import SingleFlight
+
+
+class EventSnapshotLoader:
+    """
+    Снимки событий для обработчиков записи.
+
+    Сначала проверяется event_snapshots по текущей версии события; при промахе
+    одновременные загрузки одного события и одной версии склеиваются в одну.
+    Загрузка, начатая до изменения слотов, не выдается читателям новой версии.
+    """
+
+    def __init__(self):
+        self.flight = SingleFlight()
+
+    async def get(self, event_id: int) -> EventSnapshot | None:
+        version = event_versions.version(event_id)
+        snapshot = event_snapshots.get(event_id, version)
+        if snapshot is not None:
+            return snapshot
+        return await self.flight.do((event_id, version), lambda: self._load(event_id))
+
+    async def _load(self, event_id: int) -> EventSnapshot | None:
+        async with session_scope("event.snapshot") as session:
+            return await crud_event.get_event_snapshot(session, event_id)
+
+    def stats(self) -> dict[str, int]:
+        flight = self.flight.stats()
+        return {
+            "cache_hits": event_snapshots.hits, "calls": flight["calls"],
+            "loads": flight["loads"], "inflight": flight["inflight"],
+        }
+
+
+loader = EventSnapshotLoader()
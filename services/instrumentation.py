@@ -0,0 +1,128 @@
+import asyncio
+import functools
+import re
+import time
+
+from disnake.ext import commands
+from sqlalchemy import event
+
+from database.cache import signup_index
+from database.locks import event_locks
+from services import event_embeds, event_snapshots
+from database.session import async_engine, pool_status
+from utils.metrics import REGISTRY, handler_duration, histogram, register_gauge, render_prometheus
+
+sql_duration = histogram("db_query_seconds", "Время выполнения SQL-запросов по форме запроса", label_name="query")
+rest_duration = histogram("discord_rest_seconds", "Время REST-вызовов Discord по маршруту", label_name="route")
+
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"IN \((?:[^()]|\([^()]*\))*\)", re.IGNORECASE)
+_LITERALS = re.compile(r"'[^']*'|\b\d+\b|\$\d+|\?")
+
+
+@functools.lru_cache(maxsize=2048)
+def query_shape(statement: str) -> str:
+    """Приводит SQL к форме без литералов и параметров, чтобы группировать одинаковые запросы."""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _IN_LIST.sub("IN (…)", shape)
+    shape = _LITERALS.sub("?", shape)
+    return shape[:160]
+
+
+def install_sql_timing() -> None:
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        sql_duration.observe(time.perf_counter() - started, query_shape(statement))
+
+
+def install_rest_timing(bot: commands.Bot) -> None:
+    """Оборачивает HTTP-клиент бота: каждый REST-вызов попадает в гистограмму по маршруту."""
+    original = bot.http.request
+
+    async def timed_request(route, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await original(route, **kwargs)
+        finally:
+            rest_duration.observe(time.perf_counter() - start, f"{route.method} {route.path}")
+
+    bot.http.request = timed_request
+
+
+def install_command_timing(bot: commands.Bot) -> None:
+    """Замеряет все слеш-команды и автодополнения на уровне диспетчера бота."""
+    process_commands = bot.process_application_commands
+    process_autocomplete = bot.process_app_command_autocompletion
+
+    def command_name(inter) -> str:
+        command = getattr(inter, "application_command", None)
+        return f"/{command.qualified_name}" if command else f"/{inter.data.name}"
+
+    async def timed_commands(inter):
+        start = time.perf_counter()
+        try:
+            await process_commands(inter)
+        finally:
+            handler_duration.observe(time.perf_counter() - start, command_name(inter))
+
+    async def timed_autocomplete(inter):
+        start = time.perf_counter()
+        try:
+            await process_autocomplete(inter)
+        finally:
+            handler_duration.observe(time.perf_counter() - start, f"{command_name(inter)} autocomplete")
+
+    bot.process_application_commands = timed_commands
+    bot.process_app_command_autocompletion = timed_autocomplete
+
+
+def install(bot: commands.Bot) -> None:
+    """Подключает замеры команд, SQL и REST, а также счетчики пула и индекса заявок."""
+    install_command_timing(bot)
+    install_rest_timing(bot)
+    install_sql_timing()
+    register_gauge("db_pool_connections", "Состояние пула соединений", pool_status)
+    register_gauge("signup_index", "Размер и попадания индекса заявок", signup_index.stats)
+    register_gauge("event_embed_renders", "Отрисовки анонсов: из кэша, частичные и полные", event_embeds.renderer.stats)
+    register_gauge("event_locks", "Блокировки событий: захваты, ожидания и суммарное время ожидания", event_locks.stats)
+    register_gauge("event_snapshot_loads", "Загрузки событий для записи: вызовы и запросы в БД", event_snapshots.loader.stats)
+
+
+async def _handle_metrics_request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        # Читаем запрос до пустой строки; путь не важен, отдаем метрики на любой GET
+        while (await reader.readline()).strip():
+            pass
+        body = render_prometheus().encode("utf-8")
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+            + f"Content-Length: {len(body)}\r\n".encode()
+            + b"Connection: close\r\n\r\n"
+            + body
+        )
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(host: str, port: int) -> asyncio.AbstractServer:
+    """Запускает локальный HTTP-сервер с метриками в формате Prometheus."""
+    server = await asyncio.start_server(_handle_metrics_request, host, port)
+    print(f"Метрики доступны на http://{host}:{port}/metrics")
+    return server
+
+
+def summary(name: str, limit: int = 10, sort_by: str = "count") -> list[tuple[str, int, float, float]]:
+    """Возвращает до limit серий гистограммы: (метка, количество, p50, p99)."""
+    h = REGISTRY.get(name)
+    if h is None:
+        return []
+    key = (lambda item: item[1].count) if sort_by == "count" else (lambda item: item[1].sum)
+    rows = sorted(h.series.items(), key=key, reverse=True)[:limit]
+    return [(label, s.count, s.quantile(0.5), s.quantile(0.99)) for label, s in rows]
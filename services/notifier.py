@@ -0,0 +1,171 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterable, Iterable
+
+import disnake
+from disnake.ext import commands
+
+# Повторяем только временные ошибки: 429 и ошибки на стороне Discord
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class DispatchStats:
+    """Статистика одной рассылки."""
+    event_id: int
+    total: int = 0
+    delivered: int = 0
+    failed: int = 0
+    blocked: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+    finished_at: float | None = None
+
+    @property
+    def processed(self) -> int:
+        return self.delivered + self.failed + self.blocked
+
+    @property
+    def elapsed(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Количество обработанных получателей в секунду."""
+        return self.processed / self.elapsed if self.elapsed > 0 else 0.0
+
+
+@dataclass
+class _DispatchJob:
+    stats: DispatchStats
+    content: str
+    embed: disnake.Embed | None
+    pending: int = 0
+    # Получатели еще читаются из источника
+    feeding: bool = True
+
+
+class SubscriberNotifier:
+    """
+    Фоновая рассылка ЛС подписчикам.
+
+    Обработчик команды только ставит получателей в очередь, а отправкой
+    занимается ограниченный пул воркеров. Очередь ограничена queue_size:
+    получатели читаются из источника по мере ее освобождения, поэтому
+    память не растет с числом подписчиков. Лимиты по маршрутам (buckets)
+    соблюдает HTTP-клиент disnake, а здесь ограничивается число одновременных
+    запросов и повторяются временные ошибки с экспоненциальной задержкой.
+    """
+
+    def __init__(
+        self, bot: commands.Bot, workers: int = 5, max_retries: int = 3,
+        base_delay: float = 1.0, queue_size: int = 1000
+    ):
+        self.bot = bot
+        self.workers = workers
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self._queue: asyncio.Queue[tuple[_DispatchJob, int]] = asyncio.Queue(maxsize=queue_size)
+        self._tasks: list[asyncio.Task] = []
+        self._feeders: set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        """Запускает воркеры, если они еще не запущены."""
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"subscriber-notifier-{i}")
+            for i in range(self.workers)
+        ]
+
+    def stop(self) -> None:
+        """Останавливает воркеры. Неотправленные уведомления теряются."""
+        for task in [*self._tasks, *self._feeders]:
+            task.cancel()
+        self._tasks = []
+        self._feeders.clear()
+
+    def submit(
+        self, event_id: int, user_ids: Iterable[int] | AsyncIterable[Iterable[int]], content: str,
+        embed: disnake.Embed | None = None
+    ) -> DispatchStats:
+        """
+        Ставит рассылку в очередь и сразу возвращает объект статистики.
+        user_ids — ID получателей или асинхронный источник пачек ID
+        (например, EventCog.subscriber_chunks).
+        """
+        self.start()
+        job = _DispatchJob(DispatchStats(event_id=event_id), content, embed)
+        task = asyncio.create_task(self._feed(job, user_ids), name=f"subscriber-feed-{event_id}")
+        self._feeders.add(task)
+        task.add_done_callback(self._feeders.discard)
+        return job.stats
+
+    async def _feed(self, job: _DispatchJob, user_ids: Iterable[int] | AsyncIterable[Iterable[int]]) -> None:
+        try:
+            if isinstance(user_ids, AsyncIterable):
+                async for chunk in user_ids:
+                    await self._enqueue(job, chunk)
+            else:
+                await self._enqueue(job, user_ids)
+        except Exception as e:
+            print(f"Ошибка при чтении получателей рассылки по событию #{job.stats.event_id}: {e}")
+        finally:
+            # Источник закрывается в этой же задаче, чтобы его сессия освободилась сразу
+            aclose = getattr(user_ids, "aclose", None)
+            if aclose is not None:
+                await aclose()
+            job.feeding = False
+            if job.pending == 0:
+                self._finish(job)
+
+    async def _enqueue(self, job: _DispatchJob, user_ids: Iterable[int]) -> None:
+        for user_id in user_ids:
+            job.stats.total += 1
+            job.pending += 1
+            await self._queue.put((job, user_id))
+
+    async def _worker(self) -> None:
+        while True:
+            job, user_id = await self._queue.get()
+            try:
+                await self._deliver(job, user_id)
+            except Exception as e:
+                job.stats.failed += 1
+                print(f"Произошла ошибка при отправке ЛС пользователю {user_id}: {e}")
+            finally:
+                job.pending -= 1
+                if job.pending == 0 and not job.feeding:
+                    self._finish(job)
+                self._queue.task_done()
+
+    async def _deliver(self, job: _DispatchJob, user_id: int) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                # create_dm берет канал из кэша или делает один запрос,
+                # без отдельного fetch_user на каждого получателя
+                channel = await self.bot.create_dm(disnake.Object(id=user_id))
+                await channel.send(job.content, embed=job.embed)
+                job.stats.delivered += 1
+                return
+            except disnake.Forbidden:
+                job.stats.blocked += 1
+                return
+            except disnake.HTTPException as e:
+                if e.status not in RETRYABLE_STATUSES or attempt == self.max_retries:
+                    raise
+                delay = self.base_delay * 2 ** attempt
+                await asyncio.sleep(delay + random.uniform(0, delay / 2))
+
+    def _finish(self, job: _DispatchJob) -> None:
+        stats = job.stats
+        stats.finished_at = time.perf_counter()
+        if not stats.total:
+            return
+        print(
+            f"Рассылка по событию #{stats.event_id} завершена: доставлено {stats.delivered}, "
+            f"ошибок {stats.failed}, ЛС закрыты у {stats.blocked} из {stats.total} "
+            f"за {stats.elapsed:.1f} с ({stats.throughput:.1f} получателей/с)."
+        )
@@ -0,0 +1,136 @@
+import asyncio
+import heapq
+import time
+
+import disnake
+from disnake.ext import commands
+
+from database.session import session_scope, transaction
+from database.crud import crud_event
+from .notifier import SubscriberNotifier
+
+
+class ReminderScheduler:
+    """
+    Напоминания о событиях за lead_time секунд до начала.
+
+    Ближайшие напоминания хранятся в куче (время, ID события). База
+    опрашивается не по каждому событию, а одним запросом по индексу
+    event_timestamp раз в horizon / 2 секунд: загружаются события,
+    начинающиеся в ближайшие lead_time + horizon секунд. Новые события
+    добавляются в кучу сразу через schedule.
+
+    Перед отправкой напоминание забирается атомарным UPDATE по reminded_at,
+    поэтому после перезапуска или при нескольких процессах оно не уходит
+    повторно. Участники читаются в момент отправки, так что слоты,
+    занятые после планирования, учитываются без обновления кучи.
+    """
+
+    def __init__(
+        self, bot: commands.Bot, notifier: SubscriberNotifier, lead_time: float = 1800,
+        horizon: float = 6 * 3600
+    ):
+        self.bot = bot
+        self.notifier = notifier
+        self.lead_time = lead_time
+        self.horizon = horizon
+        self._heap: list[tuple[float, int]] = []
+        # Актуальное время напоминания по событию; записи кучи с другим временем устарели
+        self._scheduled: dict[int, float] = {}
+        self._loaded_until = 0.0
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="event-reminders")
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def schedule(self, event_id: int, event_timestamp: int) -> None:
+        """Добавляет или переносит напоминание, если оно попадает в загруженный горизонт."""
+        if event_timestamp <= time.time():
+            # Событие уже началось (дату можно указать в прошлом): напоминать не о чем,
+            # как и в выборке get_upcoming_reminders
+            self._scheduled.pop(event_id, None)
+            return
+        if event_timestamp > self._loaded_until:
+            # Событие подхватит следующая загрузка горизонта
+            self._scheduled.pop(event_id, None)
+            return
+        remind_at = event_timestamp - self.lead_time
+        self._scheduled[event_id] = remind_at
+        heapq.heappush(self._heap, (remind_at, event_id))
+        self._wake.set()
+
+    def __len__(self) -> int:
+        return len(self._scheduled)
+
+    async def _load_horizon(self) -> None:
+        now = time.time()
+        until = now + self.lead_time + self.horizon
+        async with session_scope("reminders.load") as session:
+            rows = await crud_event.get_upcoming_reminders(session, int(now), int(until))
+        self._loaded_until = until
+        for event_id, event_timestamp in rows:
+            if event_id not in self._scheduled:
+                self.schedule(event_id, event_timestamp)
+
+    async def _run(self) -> None:
+        next_load = 0.0
+        while True:
+            now = time.time()
+            if now >= next_load:
+                try:
+                    await self._load_horizon()
+                except Exception as e:
+                    print(f"Не удалось загрузить ближайшие события для напоминаний: {e}")
+                next_load = now + self.horizon / 2
+
+            while self._heap and self._heap[0][0] <= time.time():
+                remind_at, event_id = heapq.heappop(self._heap)
+                if self._scheduled.get(event_id) != remind_at:
+                    continue
+                del self._scheduled[event_id]
+                try:
+                    await self._send(event_id)
+                except Exception as e:
+                    print(f"Ошибка при отправке напоминания о событии {event_id}: {e}")
+
+            deadline = min(self._heap[0][0], next_load) if self._heap else next_load
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=max(0.0, deadline - time.time()))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _send(self, event_id: int) -> None:
+        # Отметка фиксируется до отправки, чтобы другой процесс не отправил напоминание повторно
+        async with transaction("reminders.send") as session:
+            claimed = await crud_event.claim_event_reminder(session, event_id, int(time.time()))
+        if claimed is None:
+            return
+        event, user_ids = claimed
+        text = f"⏰ Событие **{event.title}** начнется <t:{event.event_timestamp}:R>."
+
+        if user_ids:
+            self.notifier.submit(event.id, user_ids, text)
+
+        channel_id = event.thread_id or event.channel_id
+        if channel_id:
+            try:
+                channel = self.bot.get_channel(channel_id) or await self.bot.fetch_channel(channel_id)
+                message = text
+                for user_id in user_ids:
+                    mention = f" <@{user_id}>"
+                    # Лимит сообщения Discord — 2000 символов
+                    if len(message) + len(mention) > 2000:
+                        await channel.send(message)
+                        message = ""
+                    message += mention
+                await channel.send(message)
+            except (disnake.NotFound, disnake.Forbidden) as e:
+                print(f"Не удалось отправить напоминание в канал события {event_id}: {e}")
@@ -0,0 +1,109 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import AsyncContextManager, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.session import session_scope
+from database.crud import crud_retention
+
+SessionFactory = Callable[[], AsyncContextManager[AsyncSession]]
+
+
+@dataclass
+class RetentionReport:
+    """Итоги одного прохода задачи хранения."""
+    events: int = 0
+    slots: int = 0
+    signup_requests: int = 0
+    elapsed: float = 0.0
+    sizes_before: dict[str, int] = field(default_factory=dict)
+    sizes_after: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def rows(self) -> int:
+        return self.events + self.slots + self.signup_requests
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        sizes = ", ".join(
+            f"{table} {self.sizes_before.get(table, 0)} → {count}" for table, count in self.sizes_after.items()
+        )
+        return (
+            f"Архивировано событий {self.events} (слотов {self.slots}), удалено заявок "
+            f"{self.signup_requests} за {self.elapsed:.1f} с ({self.rows_per_second:.0f} строк/с). "
+            f"Размеры таблиц: {sizes}."
+        )
+
+
+async def run_retention(
+    session_factory: SessionFactory, cutoff: int, batch_size: int = 500, pause: float = 0.05
+) -> RetentionReport:
+    """
+    Архивирует события, начавшиеся раньше cutoff, и удаляет заявки на занятые
+    или удаленные слоты. Каждая пачка — отдельная короткая транзакция со своим коммитом, между
+    пачками соединение возвращается в пул на pause секунд, чтобы не держать
+    блокировки и не отнимать соединения у обработчиков команд.
+    """
+    report = RetentionReport()
+    async with session_factory() as session:
+        report.sizes_before = await crud_retention.get_table_sizes(session)
+
+    start = time.perf_counter()
+    while True:
+        async with session_factory() as session:
+            events, slots = await crud_retention.archive_past_events(
+                session, cutoff, batch_size, int(time.time())
+            )
+            await session.commit()
+        report.events += events
+        report.slots += slots
+        if events < batch_size:
+            break
+        await asyncio.sleep(pause)
+
+    after = (0, 0)
+    while after is not None:
+        async with session_factory() as session:
+            deleted, after = await crud_retention.delete_resolved_signup_requests(session, batch_size, after)
+            await session.commit()
+        report.signup_requests += deleted
+        await asyncio.sleep(pause)
+    report.elapsed = time.perf_counter() - start
+
+    async with session_factory() as session:
+        report.sizes_after = await crud_retention.get_table_sizes(session)
+    return report
+
+
+class RetentionJob:
+    """Периодически запускает run_retention для событий старше retention_days дней."""
+
+    def __init__(self, retention_days: float, interval: float = 24 * 3600, batch_size: int = 500):
+        self.retention_days = retention_days
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None and self.retention_days > 0:
+            self._task = asyncio.create_task(self._run(), name="event-retention")
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            cutoff = int(time.time() - self.retention_days * 86400)
+            try:
+                report = await run_retention(lambda: session_scope("retention"), cutoff, self.batch_size)
+                print(f"Задача хранения завершена. {report}")
+            except Exception as e:
+                print(f"Ошибка задачи хранения: {e}")
+            await asyncio.sleep(self.interval)
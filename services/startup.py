@@ -0,0 +1,107 @@
+import asyncio
+import hashlib
+import importlib
+import json
+import os
+import time
+
+from disnake.ext import commands
+
+# Модули, которые не нужны для авторизации и импортируются вместе с когами
+DEFERRED_MODULES = ("services.instrumentation",)
+
+
+def parse_shard_ids(value: str | None) -> list[int] | None:
+    """Разбирает SHARD_IDS: номера через запятую и диапазоны, например "0,1" или "0-3"."""
+    if not value:
+        return None
+    shard_ids = []
+    for part in value.split(","):
+        first, _, last = part.strip().partition("-")
+        shard_ids.extend(range(int(first), int(last or first) + 1))
+    return shard_ids
+
+
+def discover_cogs(directory: str = "cogs") -> list[str]:
+    """Имена когов из BOT_COGS (через запятую) или все .py файлы из папки cogs."""
+    names = os.getenv("BOT_COGS")
+    if names:
+        return [name.strip() for name in names.split(",") if name.strip()]
+    return sorted(
+        filename[:-3] for filename in os.listdir(directory)
+        if filename.endswith(".py") and not filename.startswith("__")
+    )
+
+
+async def preload_modules(names: list[str]) -> float:
+    """
+    Импортирует модули в отдельном потоке, пока цикл событий занят авторизацией.
+
+    Сам модуль кога load_extension выполнит еще раз, но это дешево: основное
+    время уходит на его зависимости (sqlalchemy, модели), а они остаются в sys.modules.
+    Ошибки импорта здесь игнорируются — их покажет load_extension.
+    """
+    def import_all():
+        for name in names:
+            try:
+                importlib.import_module(name)
+            except Exception:
+                pass
+
+    start = time.perf_counter()
+    await asyncio.to_thread(import_all)
+    return time.perf_counter() - start
+
+
+def load_cogs(bot: commands.Bot, names: list[str]) -> dict[str, float]:
+    """Загружает коги и возвращает время загрузки каждого в секундах."""
+    timings = {}
+    for name in names:
+        start = time.perf_counter()
+        try:
+            bot.load_extension(f"cogs.{name}")
+        except Exception as e:
+            print(f"Не удалось загрузить ког {name}: {e}")
+            continue
+        timings[name] = time.perf_counter() - start
+        print(f"Успешно загружен ког: {name} ({timings[name] * 1000:.0f} мс)")
+    return timings
+
+
+def command_hash(bot: commands.Bot) -> str:
+    """Хэш описаний всех команд бота в том виде, в котором они отправляются в Discord."""
+    global_cmds, guild_cmds = bot._ordered_unsynced_commands(bot._test_guilds)
+    payload = {
+        "application_id": bot.application_id,
+        "global": [cmd.to_dict() for cmd in global_cmds],
+        "guilds": {str(guild_id): [cmd.to_dict() for cmd in cmds] for guild_id, cmds in guild_cmds.items()},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+async def sync_commands_if_changed(bot: commands.Bot, cache_path: str) -> bool:
+    """
+    Регистрирует команды в Discord, только если их описания изменились с прошлого запуска.
+
+    Встроенная синхронизация disnake на каждом старте запрашивает список команд
+    у Discord и сравнивает его с локальным. Здесь вместо этого сравнивается хэш
+    с сохраненным в cache_path, и при совпадении запросов не делается вовсе.
+    """
+    digest = command_hash(bot)
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cached = f.read().strip()
+    except FileNotFoundError:
+        cached = None
+    if cached == digest:
+        print("Команды не изменились, синхронизация пропущена.")
+        return False
+
+    global_cmds, guild_cmds = bot._ordered_unsynced_commands(bot._test_guilds)
+    await bot.bulk_overwrite_global_commands(global_cmds)
+    for guild_id, cmds in guild_cmds.items():
+        await bot.bulk_overwrite_guild_commands(guild_id, cmds)
+    with open(cache_path, "w", encoding="utf-8") as f:
+        f.write(digest)
+    print(f"Команды синхронизированы: глобальных {len(global_cmds)}, серверов {len(guild_cmds)}.")
+    return True
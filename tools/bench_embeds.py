@@ -0,0 +1,80 @@
+"""
+Микробенчмарк отрисовки анонса события (services/event_embeds).
+
+Для каждого числа слотов сравнивает три случая:
+  полная   — кэша нет, анонс строится с нуля (как до кэша отрисовки);
+  из кэша  — ничего не менялось, возвращается готовый Embed;
+  частичная — между отрисовками занят один слот, перестраивается его строка.
+
+    python -m tools.bench_embeds --slots 10,100,300,500 --iterations 2000
+"""
+import argparse
+import statistics
+import time
+from types import SimpleNamespace
+
+
+def _make_event(event_id: int, slot_count: int):
+    from database.models import Event, EventSlot
+
+    event = Event(id=event_id, owner_id=1, title="Рейд", description="Сбор у входа", event_timestamp=1_900_000_000)
+    event.slots = [
+        EventSlot(id=event_id * 10_000 + i, event_id=event_id, slot_number=i + 1, role_name=f"Роль {i + 1}")
+        for i in range(slot_count)
+    ]
+    return event
+
+
+def _measure(func, iterations: int) -> tuple[float, float]:
+    timings = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        func(i)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return statistics.median(timings), timings[min(len(timings) - 1, int(0.99 * len(timings)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slots", default="10,100,300,500", help="Числа слотов через запятую")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    from database.cache import event_versions
+    from services.event_embeds import EventEmbedRenderer
+
+    guild = SimpleNamespace(get_member=lambda user_id: None)
+    print(f"{'слотов':>7}  {'полная p50/p99, мкс':>22}  {'из кэша p50/p99, мкс':>22}  {'частичная p50/p99, мкс':>24}")
+    for slot_count in (int(value) for value in args.slots.split(",")):
+        event = _make_event(slot_count, slot_count)
+
+        uncached = EventEmbedRenderer()
+        uncached.trusted = False
+        full = _measure(lambda i: uncached.render(event, guild, event_versions.version(event.id)), args.iterations)
+
+        renderer = EventEmbedRenderer()
+        renderer.render(event, guild, event_versions.version(event.id))
+        hit = _measure(lambda i: renderer.render(event, guild, event_versions.version(event.id)), args.iterations)
+
+        def claim_and_render(i):
+            slot = event.slots[i % slot_count]
+            slot.signed_up_user_id = 1000 + i
+            event_versions.bump(event.id, slot.id)
+            renderer.render(event, guild, event_versions.version(event.id))
+
+        partial = _measure(claim_and_render, args.iterations)
+        version = event_versions.version(event.id)
+        expected = uncached.render(event, guild, version).to_dict()
+        if renderer.render(event, guild, version).to_dict() != expected:
+            raise SystemExit(f"Ошибка: отрисовка из кэша для {slot_count} слотов не совпадает с полной")
+
+        print(
+            f"{slot_count:>7}  {full[0] * 1e6:>10.1f} / {full[1] * 1e6:>9.1f}  {hit[0] * 1e6:>10.1f} / {hit[1] * 1e6:>9.1f}"
+            f"  {partial[0] * 1e6:>11.1f} / {partial[1] * 1e6:>10.1f}"
+        )
+    print(f"Счетчики последнего прогона: {renderer.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Пиковая память рассылки подписчикам в зависимости от их числа.
+
+Создает создателя с --subscribers подписчиками и прогоняет SubscriberNotifier
+с мгновенной доставкой двумя способами:
+  список — весь список ID через get_creator_subscribers (как раньше);
+  пачки  — get_creator_subscribers_page по странице на сессию с ограниченной очередью.
+Память считается через tracemalloc с начала чтения подписчиков до конца рассылки.
+
+    python -m tools.bench_notify --subscribers 10000,100000,300000
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from database.base import Base
+from database.crud import crud_subscription
+from database.models import BotRole, Subscription, User
+from services.notifier import SubscriberNotifier
+
+CREATOR_ID = 1
+BATCH_SIZE = 5_000
+
+
+class InstantBot:
+    """Бот, у которого отправка ЛС ничего не делает."""
+
+    def __init__(self):
+        self.channel = SimpleNamespace(send=self._send)
+
+    async def _send(self, *args, **kwargs):
+        pass
+
+    async def create_dm(self, user):
+        return self.channel
+
+
+async def _seed(engine, subscribers: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User), [
+            {"user_id": CREATOR_ID, "username": "creator", "balance": 0, "bot_role": BotRole.EVENT_CREATOR}
+        ])
+        for start in range(2, subscribers + 2, BATCH_SIZE):
+            user_ids = range(start, min(start + BATCH_SIZE, subscribers + 2))
+            await conn.execute(insert(User), [
+                {"user_id": user_id, "username": f"user_{user_id}", "balance": 0, "bot_role": BotRole.USER}
+                for user_id in user_ids
+            ])
+            await conn.execute(insert(Subscription), [
+                {"subscriber_id": user_id, "creator_id": CREATOR_ID} for user_id in user_ids
+            ])
+
+
+async def _dispatch(session_maker, streaming: bool, chunk_size: int) -> tuple[int, float, float]:
+    notifier = SubscriberNotifier(InstantBot(), workers=5)
+    tracemalloc.start()
+    start = time.perf_counter()
+    if streaming:
+        async def chunks():
+            after = 0
+            while True:
+                async with session_maker() as session:
+                    chunk = await crud_subscription.get_creator_subscribers_page(session, CREATOR_ID, after, chunk_size)
+                if chunk:
+                    yield chunk
+                if len(chunk) < chunk_size:
+                    return
+                after = chunk[-1]
+
+        stats = notifier.submit(0, chunks(), "bench")
+    else:
+        async with session_maker() as session:
+            subscriber_ids = await crud_subscription.get_creator_subscribers(session, CREATOR_ID)
+        stats = notifier.submit(0, subscriber_ids, "bench")
+        del subscriber_ids
+    while stats.finished_at is None:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    notifier.stop()
+    return stats.delivered, peak / 1024 / 1024, elapsed
+
+
+async def bench(url: str, sizes: list[int], chunk_size: int) -> None:
+    engine = create_async_engine(url)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    print(f"{'подписчиков':>12}  {'список: МБ / с':>16}  {'пачки: МБ / с':>16}")
+    for size in sizes:
+        await _seed(engine, size)
+        results = []
+        for streaming in (False, True):
+            delivered, peak, elapsed = await _dispatch(session_maker, streaming, chunk_size)
+            if delivered != size:
+                raise SystemExit(f"Ошибка: доставлено {delivered} из {size}")
+            results.append(f"{peak:>7.1f} / {elapsed:>6.1f}")
+        print(f"{size:>12}  {results[0]:>16}  {results[1]:>16}")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="sqlite+aiosqlite:///bench.db")
+    parser.add_argument("--subscribers", default="10000,100000", help="Числа подписчиков через запятую")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(bench(args.url, [int(value) for value in args.subscribers.split(",")], args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
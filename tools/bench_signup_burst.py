@@ -0,0 +1,101 @@
+"""
+Всплеск записей на одно популярное событие через настоящие коги (tools.replay).
+
+После публикации анонса --signups пользователей отправляют форму записи в
+пределах окна --window секунд, а организатор параллельно одобряет часть
+заявок (--approve-share), что сбрасывает снимок события. Сравниваются два
+режима:
+  снимки   — кэш снимков по версии события и склейка загрузок;
+  склейка  — кэш снимков выключен (trusted = False), только склейка
+             одновременных загрузок.
+Коэффициент склейки — число форм на одну загрузку события из БД
+(без склейки и кэша каждая форма загружала бы событие сама).
+
+    python -m tools.bench_signup_burst --signups 200 --windows 0,1,3
+"""
+import argparse
+import asyncio
+import os
+import random
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///bench_burst.db")
+
+from tools import replay
+from database.cache import event_snapshots, signup_index
+from database.invalidation import bus
+from database.session import async_engine
+from services.event_snapshots import loader
+
+CREATOR_ID = replay.CREATORS[0]
+
+
+async def _burst(args, window: float, snapshots: bool) -> dict:
+    bus.reset()
+    signup_index.loaded = False
+    harness = replay.Harness(args.rest_latency / 1000, max_inflight=10_000)
+    event_snapshots.trusted = snapshots
+    await harness.prepare(0)
+    roles = "|".join(f"роль {i}" for i in range(1, args.slots + 1))
+    await harness.dispatch({"type": "event_create", "args": {"owner_id": CREATOR_ID, "roles": roles}})
+    event_id = harness.bot.event_ids[-1]
+    # Первая заявка создает ветку, чтобы всплеск не упирался в ее создание
+    await harness.dispatch({"type": "signup", "args": {"event_id": event_id, "user_id": replay.USERS[0], "slots": "1"}})
+    harness.results.clear()
+
+    rnd = random.Random(7)
+    stream = []
+    for i in range(args.signups):
+        slot = str(rnd.randint(1, args.slots))
+        stream.append({"t": rnd.uniform(0, window), "type": "signup",
+                       "args": {"event_id": event_id, "user_id": replay.USERS[i + 1], "slots": slot}})
+        if rnd.random() < args.approve_share:
+            stream.append({"t": rnd.uniform(0, window), "type": "approve", "args": {}})
+    stream.sort(key=lambda item: item["t"])
+
+    before = loader.stats()
+    await harness.replay(stream)
+    after = loader.stats()
+    # Даем фоновым задачам (рассылка, перерисовка анонсов) завершиться
+    await asyncio.sleep(float(os.getenv("EMBED_REFRESH_DELAY", "1.5")) + 0.5)
+    harness.event_cog.cog_unload()
+
+    calls = after["calls"] + after["cache_hits"] - before["calls"] - before["cache_hits"]
+    loads = after["loads"] - before["loads"]
+    signups = harness.results["signup"]
+    return {
+        "calls": calls,
+        "loads": loads,
+        "cache_hits": after["cache_hits"] - before["cache_hits"],
+        "ratio": calls / loads if loads else float(calls),
+        "queries": sum(stats.db_queries for _, stats in signups) / len(signups),
+        "p99_ms": replay._percentile([latency for latency, _ in signups], 0.99) * 1000,
+    }
+
+
+async def bench(args) -> None:
+    print(f"{'окно, с':>8}  {'режим':>8}  {'форм':>5}  {'загрузок':>8}  {'из кэша':>7}  "
+          f"{'форм/загрузку':>13}  {'запр./форму':>11}  {'p99, мс':>8}")
+    for window in (float(value) for value in args.windows.split(",")):
+        for snapshots in (True, False):
+            result = await _burst(args, window, snapshots)
+            print(
+                f"{window:>8.1f}  {'снимки' if snapshots else 'склейка':>8}  {result['calls']:>5}  "
+                f"{result['loads']:>8}  {result['cache_hits']:>7}  {result['ratio']:>13.1f}  "
+                f"{result['queries']:>11.2f}  {result['p99_ms']:>8.1f}"
+            )
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--signups", type=int, default=200)
+    parser.add_argument("--slots", type=int, default=50, help="Слотов в событии")
+    parser.add_argument("--windows", default="0,1,3", help="Длительности всплеска в секундах через запятую")
+    parser.add_argument("--approve-share", type=float, default=0.2, help="Доля одобрений на одну заявку")
+    parser.add_argument("--rest-latency", type=float, default=50.0, help="Имитируемая задержка REST, мс")
+    args = parser.parse_args()
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Проверка числа SQL-запросов на обработчик: ловит N+1 и лишние подгрузки.
+
+Настоящие коги из tools.replay прогоняются по одному сценарию на маленьком
+и на большом наборе данных (событие на 5 и на 200 слотов, шаблон на 3 и на
+60 ролей, 3 и 40 шаблонов на сервере). Число запросов обработчика не должно
+зависеть от размера данных и не должно превышать бюджет из QUERY_BUDGETS.
+При нарушении скрипт завершается с кодом 1.
+
+    python -m tools.check_query_counts
+"""
+import asyncio
+import os
+import sys
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///query_counts.db")
+
+from tools import replay
+from database.cache import signup_index
+from database.invalidation import bus
+from database.session import async_engine
+
+# Предельное число запросов на один вызов обработчика
+QUERY_BUDGETS = {
+    "template_create": 2,
+    "event_create": 4,
+    "event_create_template": 4,
+    "signup": 4,
+    "approve": 3,
+    "refresh_embed": 2,
+    "subscribe": 2,
+    "subscription_list": 1,
+    "autocomplete_template": 1,
+    "autocomplete_creator": 2,
+    "template_list": 2,
+    "template_delete": 2,
+    "admin_setrole": 2,
+    "reaction": 0,
+}
+
+SCALES = {
+    "small": {"slots": 5, "template_roles": 3, "templates": 3},
+    "large": {"slots": 200, "template_roles": 60, "templates": 40},
+}
+
+CREATOR_ID = replay.CREATORS[0]
+USER_ID = replay.USERS[0]
+
+
+def _roles(count: int) -> str:
+    return "|".join(f"роль {i}" for i in range(1, count + 1))
+
+
+async def _run_scale(scale: dict) -> dict[str, int]:
+    # Кэши процесса с прошлого масштаба исказили бы счет: начинаем с холодных
+    bus.reset()
+    signup_index.loaded = False
+    harness = replay.Harness(rest_latency=0.0, max_inflight=1)
+    await harness.prepare(0)
+    counts: dict[str, int] = {}
+
+    async def measure(label: str, handler: str, **args) -> None:
+        stats = replay.HandlerStats()
+        token = replay._current_stats.set(stats)
+        try:
+            await harness.HANDLERS[handler](harness, args)
+        finally:
+            replay._current_stats.reset(token)
+        # Фоновые задачи (рассылка, перерисовка) учитываются в stats позже и сюда не попадают
+        counts[label] = stats.db_queries
+
+    for i in range(scale["templates"]):
+        await measure("template_create", "template_create", name=f"tpl_{i}", roles=_roles(scale["template_roles"]))
+    await measure("event_create", "event_create", owner_id=CREATOR_ID, roles=_roles(scale["slots"]))
+    event_id = harness.bot.event_ids[-1]
+    await measure("event_create_template", "event_create", owner_id=CREATOR_ID, template="tpl_0")
+    await measure("signup", "signup", event_id=event_id, user_id=USER_ID, slots="1,2,3")
+    approve_stats = []
+    while harness.bot.pending_requests:
+        await measure("approve", "approve")
+        approve_stats.append(counts["approve"])
+    # Одобрение обрабатывает по нажатию на слот: считаем на одно нажатие
+    counts["approve"] = max(approve_stats, default=0)
+    await measure("refresh_embed", "refresh_embed", event_id=event_id)
+    await measure("subscribe", "subscribe", user_id=USER_ID, creator_id=CREATOR_ID)
+    await measure("subscription_list", "subscription_list", user_id=USER_ID)
+    await measure("autocomplete_template", "autocomplete_template", input="tpl")
+    await measure("autocomplete_creator", "autocomplete_creator", input="user_1")
+    await measure("template_list", "template_list")
+    await measure("template_delete", "template_delete", name="tpl_0")
+    await measure("admin_setrole", "admin_setrole", user_id=USER_ID)
+    await measure("reaction", "reaction")
+    harness.event_cog.cog_unload()
+    return counts
+
+
+async def check() -> list[str]:
+    results = {name: await _run_scale(scale) for name, scale in SCALES.items()}
+    await async_engine.dispose()
+
+    small, large = results["small"], results["large"]
+    print(f"  {'обработчик':24} {'small':>6} {'large':>6} {'бюджет':>7}")
+    failures = []
+    for handler, budget in QUERY_BUDGETS.items():
+        print(f"  {handler:24} {small[handler]:>6} {large[handler]:>6} {budget:>7}")
+        if large[handler] > small[handler]:
+            failures.append(f"{handler}: число запросов растет с данными ({small[handler]} -> {large[handler]})")
+        if max(small[handler], large[handler]) > budget:
+            failures.append(f"{handler}: {max(small[handler], large[handler])} запросов при бюджете {budget}")
+    return failures
+
+
+def main():
+    failures = asyncio.run(check())
+    for failure in failures:
+        print(f"Ошибка: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
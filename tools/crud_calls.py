@@ -0,0 +1,150 @@
+"""Типовые вызовы каждой функции database/crud для проверок и бенчмарков."""
+import itertools
+import random
+from typing import Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.crud import crud_event, crud_retention, crud_subscription, crud_template, crud_user
+from database.models import User
+from .seed import SeedInfo
+
+CrudCall = Callable[[AsyncSession, SeedInfo, random.Random], Awaitable[object]]
+
+_unique_ids = itertools.count(900_000_000)
+
+
+def _event_id(info: SeedInfo, rnd: random.Random) -> int:
+    return rnd.randint(1, info.events)
+
+
+def _slot_id(info: SeedInfo, rnd: random.Random) -> int:
+    return rnd.randint(1, info.events * info.slots_per_event)
+
+
+def _user_id(info: SeedInfo, rnd: random.Random) -> int:
+    return rnd.randint(1, info.users)
+
+
+def _creator_id(info: SeedInfo, rnd: random.Random) -> int:
+    return rnd.randint(1, info.creators)
+
+
+async def _set_user_role(session: AsyncSession, info: SeedInfo, rnd: random.Random):
+    user = await session.get(User, _user_id(info, rnd))
+    return await crud_user.set_user_role(session, user, user.bot_role)
+
+
+async def _get_user_role(session: AsyncSession, info: SeedInfo, rnd: random.Random):
+    # Небольшой набор пользователей, чтобы кэш ролей работал как на живом сервере
+    user_id = rnd.randint(1, min(info.users, 50))
+    return await crud_user.get_user_role(session, user_id, f"user_{user_id}")
+
+
+async def _create_and_delete_template(session: AsyncSession, info: SeedInfo, rnd: random.Random):
+    name = f"bench_{next(_unique_ids)}"
+    await crud_template.create_template_with_roles(session, info.guild_id, name, ["a", "b", "c"])
+    return await crud_template.delete_template(session, info.guild_id, name)
+
+
+async def _add_and_remove_subscription(session: AsyncSession, info: SeedInfo, rnd: random.Random):
+    subscriber_id = next(_unique_ids)
+    await crud_user.get_or_create_user(session, subscriber_id, f"user_{subscriber_id}")
+    await crud_subscription.add_subscription(session, subscriber_id, _creator_id(info, rnd))
+    return await crud_subscription.remove_subscription(session, subscriber_id, _creator_id(info, rnd))
+
+
+async def _archive_past_events(session: AsyncSession, info: SeedInfo, rnd: random.Random):
+    # События в seed идут каждые 10 минут начиная с 1_700_000_000; граница
+    # внутри этого диапазона, чтобы пачка действительно переносилась. Перенос
+    # откатывается, иначе повторные вызовы вычерпали бы данные для остальных.
+    result = await crud_retention.archive_past_events(
+        session, 1_700_000_000 + _event_id(info, rnd) * 600, 500, 1_700_000_000
+    )
+    await session.rollback()
+    return result
+
+
+async def _add_and_remove_subscriptions(session: AsyncSession, info: SeedInfo, rnd: random.Random):
+    subscriber_id = next(_unique_ids)
+    creator_ids = {_creator_id(info, rnd) for _ in range(5)}
+    await crud_user.get_or_create_user(session, subscriber_id, f"user_{subscriber_id}")
+    await crud_subscription.add_subscriptions(session, subscriber_id, creator_ids)
+    return await crud_subscription.remove_subscriptions(session, subscriber_id, creator_ids)
+
+
+CRUD_CALLS: dict[str, CrudCall] = {
+    "crud_event.create_event_with_slots": lambda s, info, rnd: crud_event.create_event_with_slots(
+        s, _creator_id(info, rnd), "bench", "", 1_800_000_000, ["a", "b", "c", "d", "e"]
+    ),
+    "crud_event.get_event_by_id": lambda s, info, rnd: crud_event.get_event_by_id(s, _event_id(info, rnd)),
+    "crud_event.get_event_header": lambda s, info, rnd: crud_event.get_event_header(s, _event_id(info, rnd)),
+    "crud_event.get_event_snapshot": lambda s, info, rnd: crud_event.get_event_snapshot(s, _event_id(info, rnd)),
+    "crud_event.update_event_message_info": lambda s, info, rnd: crud_event.update_event_message_info(
+        s, _event_id(info, rnd), next(_unique_ids), 1
+    ),
+    "crud_event.update_event_thread_id": lambda s, info, rnd: crud_event.update_event_thread_id(
+        s, _event_id(info, rnd), next(_unique_ids)
+    ),
+    "crud_event.create_signup_requests": lambda s, info, rnd: crud_event.create_signup_requests(
+        s, next(_unique_ids), [_slot_id(info, rnd)], _user_id(info, rnd), 0, 0
+    ),
+    "crud_event.get_signup_requests": lambda s, info, rnd: crud_event.get_signup_requests(
+        s, 30_000_000 + _slot_id(info, rnd)
+    ),
+    "crud_event.get_signup_entries": lambda s, info, rnd: crud_event.get_signup_entries(
+        s, 30_000_000 + _slot_id(info, rnd)
+    ),
+    "crud_event.assign_user_to_slot": lambda s, info, rnd: crud_event.assign_user_to_slot(
+        s, _slot_id(info, rnd), _user_id(info, rnd)
+    ),
+    "crud_event.claim_slot_by_request": lambda s, info, rnd: crud_event.claim_slot_by_request(
+        s, 30_000_000 + _slot_id(info, rnd), _creator_id(info, rnd)
+    ),
+    "crud_event.load_signup_index": lambda s, info, rnd: crud_event.load_signup_index(s),
+    "crud_event.get_upcoming_reminders": lambda s, info, rnd: crud_event.get_upcoming_reminders(
+        s, 1_700_000_000 + _event_id(info, rnd) * 600, 1_700_000_000 + _event_id(info, rnd) * 600 + 6 * 3600
+    ),
+    "crud_event.claim_event_reminder": lambda s, info, rnd: crud_event.claim_event_reminder(
+        s, _event_id(info, rnd), 1_700_000_000
+    ),
+    "crud_retention.archive_past_events": _archive_past_events,
+    "crud_retention.delete_resolved_signup_requests": lambda s, info, rnd: crud_retention.delete_resolved_signup_requests(
+        s, 500, (30_000_000 + _slot_id(info, rnd), 0)
+    ),
+    "crud_retention.get_table_sizes": lambda s, info, rnd: crud_retention.get_table_sizes(s),
+    "crud_subscription.add_remove_subscription": _add_and_remove_subscription,
+    "crud_subscription.get_user_subscriptions": lambda s, info, rnd: crud_subscription.get_user_subscriptions(
+        s, _user_id(info, rnd)
+    ),
+    "crud_subscription.get_creator_subscribers": lambda s, info, rnd: crud_subscription.get_creator_subscribers(
+        s, info.popular_creator_id
+    ),
+    "crud_subscription.add_remove_subscriptions": _add_and_remove_subscriptions,
+    "crud_subscription.get_creator_subscribers_page": lambda s, info, rnd: crud_subscription.get_creator_subscribers_page(
+        s, info.popular_creator_id, _user_id(info, rnd), 1000
+    ),
+    "crud_subscription.get_all_creators": lambda s, info, rnd: crud_subscription.get_all_creators(s),
+    "crud_subscription.search_creators": lambda s, info, rnd: crud_subscription.search_creators(
+        s, f"user_{rnd.randint(1, 9)}"
+    ),
+    "crud_template.create_delete_template": _create_and_delete_template,
+    "crud_template.get_template_by_name": lambda s, info, rnd: crud_template.get_template_by_name(
+        s, info.guild_id, f"template_{rnd.randint(1, 200)}"
+    ),
+    "crud_template.get_template_role_names": lambda s, info, rnd: crud_template.get_template_role_names(
+        s, info.guild_id, f"template_{rnd.randint(1, 200)}"
+    ),
+    "crud_template.get_all_templates_for_guild": lambda s, info, rnd: crud_template.get_all_templates_for_guild(
+        s, info.guild_id
+    ),
+    "crud_template.get_template_names": lambda s, info, rnd: crud_template.get_template_names(s, info.guild_id),
+    "crud_template.search_template_names": lambda s, info, rnd: crud_template.search_template_names(
+        s, info.guild_id, "template_1"
+    ),
+    "crud_user.get_or_create_user": lambda s, info, rnd: crud_user.get_or_create_user(
+        s, _user_id(info, rnd), f"renamed_{rnd.randint(1, 3)}"
+    ),
+    "crud_user.get_user_role": _get_user_role,
+    "crud_user.set_user_role": _set_user_role,
+}
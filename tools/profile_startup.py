@@ -0,0 +1,98 @@
+"""
+Профилирование запуска бота без подключения к Discord.
+
+Показывает самые дорогие импорты (python -X importtime) для main.py и
+каждого кога и сравнивает время до окончания авторизации с загруженными
+когами в режимах development и production. Авторизация подменяется
+задержкой --login-latency, поэтому токен и сеть не нужны.
+
+    python -m tools.profile_startup
+    python -m tools.profile_startup --login-latency 0.4 --runs 5 --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+from services.startup import DEFERRED_MODULES, discover_cogs
+
+MODE_SCRIPT = """
+import asyncio, os, time
+start = time.perf_counter()
+import disnake.http
+
+async def static_login(self, token):
+    await asyncio.sleep(float(os.environ["FAKE_LOGIN_LATENCY"]))
+    return {"id": "1", "username": "bot", "discriminator": "0", "avatar": None}
+
+disnake.http.HTTPClient.static_login = static_login
+
+import main
+
+main.bot.loop.run_until_complete(main.bot.login("token"))
+print(time.perf_counter() - start, len(main.bot.cogs), flush=True)
+os._exit(0)
+"""
+
+
+def _env(**extra: str) -> dict[str, str]:
+    env = dict(os.environ, **extra)
+    env.setdefault("DATABASE_URL", "sqlite+aiosqlite:///startup.db")
+    env.setdefault("TEST_GUILD_ID", "1")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+    return env
+
+
+def import_times(module: str) -> list[tuple[str, int, int]]:
+    """(модуль, собственное время, накопленное время) в микросекундах для импорта module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=_env(BOT_MODE="production"), capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def time_to_login(mode: str, login_latency: float) -> tuple[float, int]:
+    result = subprocess.run(
+        [sys.executable, "-c", MODE_SCRIPT],
+        env=_env(BOT_MODE=mode, FAKE_LOGIN_LATENCY=str(login_latency)),
+        capture_output=True, text=True, check=True,
+    )
+    elapsed, cogs = result.stdout.strip().splitlines()[-1].split()
+    return float(elapsed), int(cogs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=10, help="Сколько самых дорогих модулей показать")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--login-latency", type=float, default=0.3, help="Имитируемая задержка авторизации, с")
+    args = parser.parse_args()
+
+    print("Импорт (накопленное время):")
+    for module in ["main", *DEFERRED_MODULES, *(f"cogs.{name}" for name in discover_cogs())]:
+        rows = import_times(module)
+        own = next((cumulative for name, _, cumulative in rows if name == module), 0)
+        print(f"  {module:35} {own / 1000:8.1f} мс")
+
+    print(f"\nСамые дорогие модули при полной загрузке (собственное время), топ {args.top}:")
+    rows = import_times("main; import " + ", ".join(f"cogs.{name}" for name in discover_cogs()))
+    for name, self_us, cumulative_us in sorted(rows, key=lambda row: row[1], reverse=True)[:args.top]:
+        print(f"  {name:45} {self_us / 1000:8.1f} мс  (накопленное {cumulative_us / 1000:.1f} мс)")
+
+    print(f"\nВремя до окончания авторизации с загруженными когами (задержка входа {args.login_latency} с):")
+    for mode in ("development", "production"):
+        samples = [time_to_login(mode, args.login_latency) for _ in range(args.runs)]
+        median = statistics.median(elapsed for elapsed, _ in samples)
+        print(f"  {mode:12} {median * 1000:8.1f} мс, когов загружено: {samples[-1][1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,551 @@
+"""
+Нагрузочный прогон настоящих когов на поддельном боте.
+
+EventCog, SubscriptionCog, TemplateCog и AdminCog получают поддельные бот,
+взаимодействия и HTTP-слой Discord. Поток событий (слеш-команды, нажатия
+кнопок, отправки форм, реакции) берется из записи в JSONL или генерируется
+синтетически и воспроизводится с заданной частотой. Для каждого типа
+событий измеряются задержка обработчика, время в БД, число запросов и
+коммитов, время удержания соединения из пула и число REST-вызовов,
+а для всего прогона — отставание от расписания и число обработчиков в работе.
+
+    python -m tools.replay --rate 50 --duration 30
+    python -m tools.replay --ramp 10,25,50,100,200 --duration 15 --rest-latency 80
+    python -m tools.replay --input recorded.jsonl --speed 2
+
+Формат записи: по одному JSON на строку,
+{"t": <секунды от начала>, "type": "<тип события>", "args": {...}}.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///replay.db")
+
+from sqlalchemy import event as sa_event
+
+from database.base import Base
+from database.cache import signup_index
+from database.models import BotRole, User
+from database.session import async_engine, async_session_maker
+
+from cogs.admin_cog import AdminCog
+from cogs.event_cog import EventCog
+from cogs.subscription_cog import SubscriptionCog, autocomplete_event_creators
+from cogs.template_cog import TemplateCog, autocomplete_template_name
+
+GUILD_ID = 1
+CHANNEL_ID = 10
+BOT_USER_ID = 999
+CREATORS = range(1, 21)
+USERS = range(100, 5100)
+
+_ids = itertools.count(1_000_000)
+
+
+# --- Учет метрик по обработчику ---
+
+@dataclass
+class HandlerStats:
+    db_time: float = 0.0
+    db_queries: int = 0
+    db_commits: int = 0
+    # Сколько обработчик держал соединения из пула, включая ожидание REST внутри транзакции
+    db_hold: float = 0.0
+    rest_calls: int = 0
+
+
+_current_stats: ContextVar[HandlerStats | None] = ContextVar("_current_stats", default=None)
+
+
+@sa_event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("replay_started", []).append(time.perf_counter())
+
+
+@sa_event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["replay_started"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.db_time += time.perf_counter() - started
+        stats.db_queries += 1
+
+
+@sa_event.listens_for(async_engine.sync_engine, "commit")
+def _on_commit(conn):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.db_commits += 1
+
+
+@sa_event.listens_for(async_engine.sync_engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    connection_record.info["replay_checkout"] = (_current_stats.get(), time.perf_counter())
+
+
+@sa_event.listens_for(async_engine.sync_engine, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    stats, checked_out_at = connection_record.info.pop("replay_checkout", (None, 0.0))
+    if stats is not None:
+        stats.db_hold += time.perf_counter() - checked_out_at
+
+
+# --- Поддельный HTTP-слой и объекты Discord ---
+
+class FakeHTTP:
+    """Считает REST-вызовы по маршрутам и имитирует задержку Discord."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls: dict[str, int] = defaultdict(int)
+
+    async def request(self, route: str) -> None:
+        self.calls[route] += 1
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.rest_calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+
+class FakeUser:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.name = f"user_{user_id}"
+        self.display_name = self.name
+        self.mention = f"<@{user_id}>"
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+
+    def get_member(self, user_id: int):
+        return None
+
+
+class FakeMessage:
+    def __init__(self, http: FakeHTTP, channel: "FakeChannel", content: str = "", components=None):
+        self.id = next(_ids)
+        self._http = http
+        self.channel = channel
+        self.guild = channel.guild
+        self.content = content
+        self.components = [FakeActionRow([c._underlying for c in components])] if components else []
+
+    async def edit(self, **kwargs):
+        await self._http.request("PATCH /channels/{channel_id}/messages/{message_id}")
+
+    async def clear_reactions(self):
+        await self._http.request("DELETE /channels/{channel_id}/messages/{message_id}/reactions")
+
+    async def add_reaction(self, emoji):
+        await self._http.request("PUT /channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me")
+
+    async def create_thread(self, name: str):
+        await self._http.request("POST /channels/{channel_id}/messages/{message_id}/threads")
+        thread = FakeChannel(self._http, self.channel.bot, self.guild, channel_id=next(_ids))
+        self.channel.threads[thread.id] = thread
+        return thread
+
+
+class FakeActionRow:
+    def __init__(self, children):
+        self.children = children
+
+
+class FakeChannel:
+    def __init__(self, http: FakeHTTP, bot: "FakeBot", guild: FakeGuild, channel_id: int):
+        self.id = channel_id
+        self._http = http
+        self.bot = bot
+        self.guild = guild
+        self.mention = f"<#{channel_id}>"
+        self.threads: dict[int, FakeChannel] = {}
+        self.messages: dict[int, FakeMessage] = {}
+        bot.channels[channel_id] = self
+
+    async def send(self, content: str = "", embed=None, components=None, **kwargs):
+        await self._http.request("POST /channels/{channel_id}/messages")
+        if components is not None and not isinstance(components, list):
+            components = [components]
+        message = FakeMessage(self._http, self, content, components)
+        self.messages[message.id] = message
+        for component in components or []:
+            if component.custom_id.startswith("event_signup:"):
+                self.bot.event_ids.append(int(component.custom_id.split(":")[1]))
+        if components and "подтвердите" in content:
+            self.bot.pending_requests.append(message)
+        return message
+
+    def get_thread(self, thread_id: int):
+        return self.threads.get(thread_id)
+
+    def get_partial_message(self, message_id: int):
+        return self.messages.get(message_id) or FakeMessage(self._http, self)
+
+    async def fetch_message(self, message_id: int):
+        await self._http.request("GET /channels/{channel_id}/messages/{message_id}")
+        return self.get_partial_message(message_id)
+
+
+class FakeBot:
+    def __init__(self, http: FakeHTTP, shard_ids: list[int] | None = None, shard_count: int | None = None):
+        self.http = http
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self.user = FakeUser(BOT_USER_ID)
+        self.channels: dict[int, FakeChannel] = {}
+        self.pending_requests: list[FakeMessage] = []
+        self.event_ids: list[int] = []
+        self.guild = FakeGuild(GUILD_ID)
+
+    def get_channel(self, channel_id: int):
+        return self.channels.get(channel_id)
+
+    async def fetch_channel(self, channel_id: int):
+        await self.http.request("GET /channels/{channel_id}")
+        # Канал мог создать другой процесс (шард): такой же объект получаем через REST
+        return self.channels.get(channel_id) or FakeChannel(self.http, self, self.guild, channel_id)
+
+    async def create_dm(self, user):
+        await self.http.request("POST /users/@me/channels")
+        return FakeChannel(self.http, self, self.guild, channel_id=next(_ids))
+
+    def add_view(self, view):
+        pass
+
+
+class FakeResponse:
+    """Ответ на взаимодействие: идет через веб-хук взаимодействия, а не REST API бота."""
+
+    def __init__(self, http: FakeHTTP):
+        self._http = http
+        self.modal = None
+
+    async def defer(self, **kwargs):
+        await self._http.request("POST /interactions/{id}/{token}/callback")
+
+    async def send_modal(self, modal):
+        self.modal = modal
+        await self._http.request("POST /interactions/{id}/{token}/callback")
+
+    async def send_message(self, *args, **kwargs):
+        await self._http.request("POST /interactions/{id}/{token}/callback")
+
+    async def edit_message(self, *args, **kwargs):
+        await self._http.request("POST /interactions/{id}/{token}/callback")
+
+
+class FakeFollowup:
+    def __init__(self, http: FakeHTTP):
+        self._http = http
+
+    async def send(self, *args, **kwargs):
+        await self._http.request("POST /webhooks/{application_id}/{token}")
+
+
+class FakeInteraction:
+    def __init__(self, bot: FakeBot, author_id: int, channel: FakeChannel, **extra):
+        self.author = FakeUser(author_id)
+        self.guild = bot.guild
+        self.channel = channel
+        self.response = FakeResponse(bot.http)
+        self.followup = FakeFollowup(bot.http)
+        self.__dict__.update(extra)
+
+
+class FakeComponent:
+    def __init__(self, custom_id: str):
+        self.custom_id = custom_id
+
+
+class FakeReaction:
+    def __init__(self, message: FakeMessage, user_id: int, emoji: str = "✅"):
+        self.user_id = user_id
+        self.emoji = emoji
+        self.message_id = message.id
+        self.channel_id = message.channel.id
+        self.member = FakeInteraction(message.channel.bot, user_id, message.channel)
+
+
+# --- Прогон ---
+
+async def reset_database() -> None:
+    """Пересоздает схему и добавляет создателей событий."""
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_session_maker() as session:
+        session.add_all(
+            User(user_id=user_id, username=f"user_{user_id}", bot_role=BotRole.EVENT_CREATOR)
+            for user_id in CREATORS
+        )
+        await session.commit()
+
+
+class Harness:
+    def __init__(
+        self, rest_latency: float, max_inflight: int,
+        shard_ids: list[int] | None = None, shard_count: int | None = None
+    ):
+        self.http = FakeHTTP(rest_latency)
+        self.bot = FakeBot(self.http, shard_ids, shard_count)
+        self.channel = FakeChannel(self.http, self.bot, self.bot.guild, CHANNEL_ID)
+        self.event_cog = EventCog(self.bot)
+        self.subscription_cog = SubscriptionCog(self.bot)
+        self.template_cog = TemplateCog(self.bot)
+        self.admin_cog = AdminCog(self.bot)
+        self.semaphore = asyncio.Semaphore(max_inflight)
+        self.rnd = random.Random(3)
+        self.results: dict[str, list[tuple[float, HandlerStats]]] = defaultdict(list)
+        self.lags: list[float] = []
+        self.inflight = 0
+        self.max_inflight_seen = 0
+
+    async def prepare(self, events: int, reset: bool = True) -> None:
+        """Пересоздает схему (если reset) и создает events событий."""
+        if reset:
+            await reset_database()
+        await self.event_cog.on_ready()
+        for _ in range(events):
+            await self.dispatch({"type": "event_create", "args": {}})
+        self.results.clear()
+
+    def _inter(self, author_id: int, channel: FakeChannel | None = None, **extra) -> FakeInteraction:
+        return FakeInteraction(self.bot, author_id, channel or self.channel, **extra)
+
+    async def _event_create(self, args):
+        owner = args.get("owner_id") or self.rnd.choice(CREATORS)
+        inter = self._inter(owner)
+        cog = self.event_cog
+        template = args.get("template")
+        await cog.create.callback(
+            cog, inter, title=args.get("title", "Рейд"), description="",
+            date_time=args.get("date_time", "20:00 01.01.2030"),
+            template=template, roles=None if template else args.get("roles", "танк|хил|дд|дд|дд"),
+        )
+
+    async def _signup(self, args):
+        event_id = args.get("event_id") or self.rnd.choice(self.bot.event_ids)
+        user_id = args.get("user_id") or self.rnd.choice(USERS)
+        click = self._inter(user_id, component=FakeComponent(f"event_signup:{event_id}"))
+        await self.event_cog.on_button_click(click)
+        modal = click.response.modal
+        slots = args.get("slots") or str(self.rnd.randint(1, 5))
+        submit = self._inter(user_id, text_values={"slot_input": slots})
+        await modal.callback(submit)
+
+    async def _approve(self, args):
+        if not self.bot.pending_requests:
+            return
+        message = self.bot.pending_requests.pop(self.rnd.randrange(len(self.bot.pending_requests)))
+        entries = signup_index.lookup(message.id) or {}
+        for slot_id, entry in list(entries.items()):
+            inter = self._inter(
+                entry.owner_id, message.channel, message=message,
+                component=FakeComponent(f"signup_approve:{slot_id}")
+            )
+            await self.event_cog.on_button_click(inter)
+
+    async def _reaction(self, args):
+        # Посторонняя реакция в канале: должна отбрасываться без БД
+        message = FakeMessage(self.http, self.channel)
+        await self.event_cog.on_raw_reaction_add(FakeReaction(message, self.rnd.choice(USERS)))
+
+    async def _subscribe(self, args):
+        inter = self._inter(args.get("user_id") or self.rnd.choice(USERS))
+        cog = self.subscription_cog
+        await cog.subscribe.callback(cog, inter, creator=FakeUser(args.get("creator_id") or self.rnd.choice(CREATORS)))
+
+    async def _template_create(self, args):
+        inter = self._inter(self.rnd.choice(CREATORS))
+        cog = self.template_cog
+        await cog.create.callback(
+            cog, inter, name=args.get("name") or f"tpl_{next(_ids)}", roles=args.get("roles", "танк|хил|дд")
+        )
+
+    async def _template_list(self, args):
+        cog = self.template_cog
+        await cog.list.callback(cog, self._inter(self.rnd.choice(USERS)))
+
+    async def _template_delete(self, args):
+        cog = self.template_cog
+        await cog.delete.callback(cog, self._inter(self.rnd.choice(CREATORS)), name=args.get("name", "tpl_missing"))
+
+    async def _subscription_list(self, args):
+        cog = self.subscription_cog
+        await cog.list_subscriptions.callback(cog, self._inter(args.get("user_id") or self.rnd.choice(USERS)))
+
+    async def _refresh_embed(self, args):
+        await self.event_cog.refresh_event_embed(args.get("event_id") or self.rnd.choice(self.bot.event_ids))
+
+    async def _autocomplete_template(self, args):
+        await autocomplete_template_name(self._inter(self.rnd.choice(USERS)), args.get("input", "tpl_1"))
+
+    async def _autocomplete_creator(self, args):
+        await autocomplete_event_creators(self._inter(self.rnd.choice(USERS)), args.get("input", "user_1"))
+
+    async def _admin_setrole(self, args):
+        inter = self._inter(BOT_USER_ID)
+        cog = self.admin_cog
+        await cog.set_role.callback(
+            cog, inter, user=FakeUser(args.get("user_id") or self.rnd.choice(CREATORS)), role=BotRole.EVENT_CREATOR
+        )
+
+    HANDLERS = {
+        "event_create": _event_create,
+        "signup": _signup,
+        "approve": _approve,
+        "reaction": _reaction,
+        "subscribe": _subscribe,
+        "template_create": _template_create,
+        "autocomplete_template": _autocomplete_template,
+        "autocomplete_creator": _autocomplete_creator,
+        "admin_setrole": _admin_setrole,
+        # Не входят в синтетическую смесь, вызываются явно (tools.check_query_counts)
+        "template_list": _template_list,
+        "template_delete": _template_delete,
+        "subscription_list": _subscription_list,
+        "refresh_embed": _refresh_embed,
+    }
+
+    async def dispatch(self, item: dict, scheduled_at: float | None = None) -> None:
+        async with self.semaphore:
+            if scheduled_at is not None:
+                self.lags.append(time.perf_counter() - scheduled_at)
+            self.inflight += 1
+            self.max_inflight_seen = max(self.max_inflight_seen, self.inflight)
+            stats = HandlerStats()
+            _current_stats.set(stats)
+            start = time.perf_counter()
+            try:
+                await self.HANDLERS[item["type"]](self, item.get("args", {}))
+            except Exception as e:
+                print(f"Ошибка в обработчике {item['type']}: {e!r}")
+            finally:
+                self.inflight -= 1
+                self.results[item["type"]].append((time.perf_counter() - start, stats))
+
+    async def replay(self, stream: list[dict], speed: float = 1.0) -> float:
+        tasks = []
+        start = time.perf_counter()
+        for item in stream:
+            scheduled_at = start + item["t"] / speed
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(self.dispatch(item, scheduled_at)))
+        await asyncio.gather(*tasks)
+        return time.perf_counter() - start
+
+
+# Синтетическая смесь событий: доля каждого типа
+DEFAULT_MIX = {
+    "signup": 0.35, "approve": 0.15, "reaction": 0.25, "autocomplete_template": 0.08,
+    "autocomplete_creator": 0.05, "subscribe": 0.05, "event_create": 0.04,
+    "template_create": 0.02, "admin_setrole": 0.01,
+}
+
+
+def synthetic_stream(rate: float, duration: float, mix: dict[str, float], seed: int = 5) -> list[dict]:
+    rnd = random.Random(seed)
+    types, weights = zip(*mix.items())
+    count = int(rate * duration)
+    return [
+        {"t": i / rate, "type": rnd.choices(types, weights)[0], "args": {}}
+        for i in range(count)
+    ]
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def report(harness: Harness, target_rate: float | None, elapsed: float) -> dict:
+    total = sum(len(v) for v in harness.results.values())
+    summary = {
+        "target_rate": target_rate,
+        "achieved_rate": round(total / elapsed, 1) if elapsed else 0.0,
+        "lag_p50_ms": round(_percentile(harness.lags, 0.5) * 1000, 1),
+        "lag_p99_ms": round(_percentile(harness.lags, 0.99) * 1000, 1),
+        "max_inflight": harness.max_inflight_seen,
+        "rest_calls": dict(harness.http.calls),
+        "handlers": {},
+    }
+    print(
+        f"Цель {target_rate} соб/с, получено {summary['achieved_rate']} соб/с, "
+        f"отставание p50 {summary['lag_p50_ms']} мс / p99 {summary['lag_p99_ms']} мс, "
+        f"одновременно до {summary['max_inflight']}"
+    )
+    for name, rows in sorted(harness.results.items()):
+        latencies = [latency for latency, _ in rows]
+        handler = summary["handlers"][name] = {
+            "count": len(rows),
+            "p50_ms": round(_percentile(latencies, 0.5) * 1000, 2),
+            "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+            "db_ms": round(sum(s.db_time for _, s in rows) / len(rows) * 1000, 2),
+            "db_queries": round(sum(s.db_queries for _, s in rows) / len(rows), 2),
+            "db_commits": round(sum(s.db_commits for _, s in rows) / len(rows), 2),
+            "db_hold_ms": round(sum(s.db_hold for _, s in rows) / len(rows) * 1000, 2),
+            "rest_calls": round(sum(s.rest_calls for _, s in rows) / len(rows), 2),
+        }
+        print(
+            f"  {name:22} n={handler['count']:5}  p50 {handler['p50_ms']:8.2f} мс  p99 {handler['p99_ms']:8.2f} мс  "
+            f"БД {handler['db_ms']:7.2f} мс / {handler['db_queries']:5} запр. / {handler['db_commits']:4} комм.  "
+            f"соед. {handler['db_hold_ms']:7.2f} мс  REST {handler['rest_calls']:5}"
+        )
+    return summary
+
+
+async def main_async(args) -> list[dict]:
+    summaries = []
+    rates = [float(r) for r in args.ramp.split(",")] if args.ramp else [args.rate]
+    for rate in rates:
+        harness = Harness(args.rest_latency / 1000, args.max_inflight)
+        await harness.prepare(args.events)
+        if args.input:
+            with open(args.input, encoding="utf-8") as f:
+                stream = [json.loads(line) for line in f if line.strip()]
+            rate = None
+        else:
+            stream = synthetic_stream(rate, args.duration, DEFAULT_MIX)
+        elapsed = await harness.replay(stream, args.speed)
+        # Даем фоновым задачам (рассылка, перерисовка анонсов) завершиться
+        await asyncio.sleep(float(os.getenv("EMBED_REFRESH_DELAY", "1.5")) + 0.5)
+        harness.event_cog.cog_unload()
+        summaries.append(report(harness, rate, elapsed))
+    await async_engine.dispose()
+    return summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", help="Записанный поток событий в JSONL")
+    parser.add_argument("--rate", type=float, default=20.0, help="Событий в секунду для синтетического потока")
+    parser.add_argument("--ramp", help="Несколько частот через запятую для поиска точки насыщения")
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--speed", type=float, default=1.0, help="Множитель скорости воспроизведения")
+    parser.add_argument("--events", type=int, default=20, help="Сколько событий создать перед прогоном")
+    parser.add_argument("--rest-latency", type=float, default=50.0, help="Имитируемая задержка REST, мс")
+    parser.add_argument("--max-inflight", type=int, default=1000, help="Предел одновременных обработчиков")
+    parser.add_argument("--output", help="Сохранить итоги в JSON")
+    args = parser.parse_args()
+
+    summaries = asyncio.run(main_async(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summaries, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
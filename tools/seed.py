@@ -0,0 +1,101 @@
+"""Заполнение локальной БД синтетическими данными для проверок и бенчмарков."""
+import random
+from dataclasses import dataclass
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from database.base import Base
+from database.models import (
+    BotRole, Event, EventSlot, SignupRequest, Subscription, Template, TemplateRole, User
+)
+
+BATCH_SIZE = 5_000
+
+
+@dataclass
+class SeedInfo:
+    """Параметры и характерные ID заполненной БД."""
+    users: int
+    creators: int
+    events: int
+    slots_per_event: int
+    subscriptions: int
+    guild_id: int = 1
+    # Создатель с наибольшим числом подписчиков
+    popular_creator_id: int = 1
+
+
+async def _insert_batched(conn, table, rows) -> None:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            await conn.execute(insert(table), batch)
+            batch = []
+    if batch:
+        await conn.execute(insert(table), batch)
+
+
+async def seed_database(
+    engine: AsyncEngine, events: int, slots_per_event: int = 5,
+    users: int | None = None, subscriptions: int | None = None, templates: int = 200,
+    seed: int = 42
+) -> SeedInfo:
+    """Пересоздает схему и заполняет ее. Размеры по умолчанию выводятся из числа событий."""
+    rnd = random.Random(seed)
+    users = users or max(100, events // 2)
+    subscriptions = subscriptions or events
+    creators = max(1, users // 50)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+        await _insert_batched(conn, User.__table__, (
+            {
+                "user_id": user_id, "username": f"user_{user_id}", "balance": 0,
+                "bot_role": BotRole.EVENT_CREATOR if user_id <= creators else BotRole.USER,
+            }
+            for user_id in range(1, users + 1)
+        ))
+        await _insert_batched(conn, Template.__table__, (
+            {"id": i, "guild_id": 1 + i % 10, "name": f"template_{i}"} for i in range(1, templates + 1)
+        ))
+        await _insert_batched(conn, TemplateRole.__table__, (
+            {"template_id": i, "role_name": f"role_{j}"}
+            for i in range(1, templates + 1) for j in range(5)
+        ))
+        await _insert_batched(conn, Event.__table__, (
+            {
+                "id": i, "owner_id": rnd.randint(1, creators), "title": f"event_{i}",
+                "description": "", "event_timestamp": 1_700_000_000 + i * 600,
+                "message_id": 10_000_000 + i, "channel_id": 1, "thread_id": 20_000_000 + i,
+            }
+            for i in range(1, events + 1)
+        ))
+        await _insert_batched(conn, EventSlot.__table__, (
+            {
+                "id": (i - 1) * slots_per_event + j + 1, "event_id": i, "slot_number": j + 1,
+                "role_name": f"role_{j}",
+                "signed_up_user_id": rnd.randint(1, users) if rnd.random() < 0.5 else None,
+            }
+            for i in range(1, events + 1) for j in range(slots_per_event)
+        ))
+        await _insert_batched(conn, SignupRequest.__table__, (
+            {"request_message_id": 30_000_000 + slot_id, "slot_id": slot_id, "requester_id": rnd.randint(1, users)}
+            for slot_id in range(1, events * slots_per_event + 1, 3)
+        ))
+
+        # Первый создатель самый популярный, остальные подписки распределены случайно
+        pairs = {(subscriber, 1) for subscriber in range(2, min(users, subscriptions // 2) + 1)}
+        while len(pairs) < min(subscriptions, users * creators):
+            pairs.add((rnd.randint(1, users), rnd.randint(1, creators)))
+        await _insert_batched(conn, Subscription.__table__, (
+            {"subscriber_id": subscriber, "creator_id": creator} for subscriber, creator in pairs
+        ))
+
+    return SeedInfo(
+        users=users, creators=creators, events=events,
+        slots_per_event=slots_per_event, subscriptions=len(pairs)
+    )
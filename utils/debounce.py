@@ -0,0 +1,42 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable
+
+
+class KeyedDebouncer:
+    """
+    Склеивает частые изменения по ключу в один вызов callback.
+
+    Первый mark_dirty планирует вызов через delay секунд, последующие отметки
+    в этом окне ничего не добавляют. Если ключ отмечен во время выполнения
+    callback, вызов повторяется еще раз, поэтому последний вызов всегда видит
+    самое свежее состояние.
+    """
+
+    def __init__(self, delay: float, callback: Callable[[Hashable], Awaitable[None]]):
+        self.delay = delay
+        self.callback = callback
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+        self._dirty: set[Hashable] = set()
+
+    def mark_dirty(self, key: Hashable) -> None:
+        self._dirty.add(key)
+        if key not in self._tasks:
+            self._tasks[key] = asyncio.create_task(self._run(key))
+
+    async def _run(self, key: Hashable) -> None:
+        try:
+            while key in self._dirty:
+                await asyncio.sleep(self.delay)
+                self._dirty.discard(key)
+                try:
+                    await self.callback(key)
+                except Exception as e:
+                    print(f"Ошибка при отложенной обработке {key!r}: {e}")
+        finally:
+            self._tasks.pop(key, None)
+
+    def cancel_all(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        self._dirty.clear()
@@ -0,0 +1,78 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncContextManager, AsyncIterator, Hashable, Protocol
+
+from utils.metrics import histogram
+
+lock_wait = histogram("lock_wait_seconds", "Ожидание блокировки по ключу", label_name="lock")
+
+
+class LockBackend(Protocol):
+    """Межпроцессная блокировка ключа на время блока async with."""
+
+    def hold(self, name: str, key: Hashable) -> AsyncContextManager[None]:
+        ...
+
+
+@dataclass
+class _Entry:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # Сколько задач держит или ждет блокировку; при нуле запись удаляется
+    users: int = 0
+
+
+class KeyedLocks:
+    """
+    Реестр асинхронных блокировок по ключу: критические секции одного ключа
+    выполняются по очереди, разных ключей — параллельно.
+
+    Внутри процесса ключ защищает asyncio.Lock, который существует, пока его
+    кто-то держит или ждет. Если задан backend, после локальной блокировки
+    берется и межпроцессная, поэтому из процесса к ней обращается не больше
+    одной задачи на ключ. Ожидание обеих измеряется в lock_wait с меткой name.
+    """
+
+    def __init__(self, name: str, backend: LockBackend | None = None):
+        self.name = name
+        self.backend = backend
+        self._entries: dict[Hashable, _Entry] = {}
+        self.acquired = 0
+        self.contended = 0
+        self.wait_time = 0.0
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable) -> AsyncIterator[None]:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry()
+        entry.users += 1
+        start = time.perf_counter()
+        try:
+            if entry.lock.locked():
+                self.contended += 1
+            async with entry.lock:
+                if self.backend is None:
+                    self._acquired(start)
+                    yield
+                else:
+                    async with self.backend.hold(self.name, key):
+                        self._acquired(start)
+                        yield
+        finally:
+            entry.users -= 1
+            if not entry.users:
+                del self._entries[key]
+
+    def _acquired(self, start: float) -> None:
+        waited = time.perf_counter() - start
+        self.acquired += 1
+        self.wait_time += waited
+        lock_wait.observe(waited, self.name)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "keys": len(self._entries), "acquired": self.acquired,
+            "contended": self.contended, "wait_seconds": round(self.wait_time, 3),
+        }
@@ -0,0 +1,118 @@
+import functools
+import time
+from bisect import bisect_left
+from typing import Callable
+
+# Границы корзин по умолчанию, в секундах
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class HistogramSeries:
+    """Накопленные наблюдения одной серии гистограммы."""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Оценка квантиля по верхней границе корзины."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+
+class Histogram:
+    """Гистограмма с сериями по метке (например, по имени обработчика)."""
+
+    def __init__(
+        self, name: str, description: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        label_name: str = "label"
+    ):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.label_name = label_name
+        self.series: dict[str, HistogramSeries] = {}
+
+    def observe(self, value: float, label: str = "") -> None:
+        series = self.series.get(label)
+        if series is None:
+            series = self.series[label] = HistogramSeries(self.buckets)
+        series.observe(value)
+
+
+# Все гистограммы процесса по имени
+REGISTRY: dict[str, Histogram] = {}
+# Мгновенные значения, которые вычисляются при каждом чтении метрик
+GAUGES: dict[str, tuple[str, Callable[[], dict[str, float]]]] = {}
+
+
+def histogram(
+    name: str, description: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS, label_name: str = "label"
+) -> Histogram:
+    """Возвращает гистограмму из реестра, создавая ее при первом обращении."""
+    if name not in REGISTRY:
+        REGISTRY[name] = Histogram(name, description, buckets, label_name)
+    return REGISTRY[name]
+
+
+def register_gauge(name: str, description: str, collect: Callable[[], dict[str, float]]) -> None:
+    """Регистрирует набор значений {метка: число}, читаемых при выводе метрик."""
+    GAUGES[name] = (description, collect)
+
+
+handler_duration = histogram("bot_handler_seconds", "Время выполнения обработчиков бота", label_name="handler")
+
+
+def timed(name: str):
+    """Декоратор: замеряет время выполнения корутины-обработчика."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                handler_duration.observe(time.perf_counter() - start, name)
+        return wrapper
+    return decorator
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def render_prometheus() -> str:
+    """Выводит все метрики в текстовом формате Prometheus."""
+    lines = []
+    for h in REGISTRY.values():
+        lines.append(f"# HELP {h.name} {h.description}")
+        lines.append(f"# TYPE {h.name} histogram")
+        for label, series in h.series.items():
+            label_pair = f'{h.label_name}="{_escape(label)}"'
+            cumulative = 0
+            for bound, count in zip(h.buckets, series.counts):
+                cumulative += count
+                lines.append(f'{h.name}_bucket{{{label_pair},le="{bound}"}} {cumulative}')
+            lines.append(f'{h.name}_bucket{{{label_pair},le="+Inf"}} {series.count}')
+            lines.append(f"{h.name}_sum{{{label_pair}}} {series.sum}")
+            lines.append(f"{h.name}_count{{{label_pair}}} {series.count}")
+    for name, (description, collect) in GAUGES.items():
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} gauge")
+        for label, value in collect().items():
+            lines.append(f'{name}{{key="{_escape(label)}"}} {value}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,41 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Склеивает одновременные загрузки по ключу.
+
+    Пока загрузка ключа идет, остальные вызовы do с тем же ключом ждут ее
+    результат (или исключение), а не запускают свою. Загрузка выполняется
+    отдельной задачей, поэтому отмена одного из ждущих не отменяет ее для
+    остальных. Результат не кэшируется: следующий вызов после завершения
+    загрузки запускает новую.
+    """
+
+    def __init__(self):
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.loads = 0
+
+    async def do(self, key: Hashable, loader: Callable[[], Awaitable[T]]) -> T:
+        self.calls += 1
+        task = self._tasks.get(key)
+        if task is None:
+            self.loads += 1
+            task = asyncio.create_task(loader())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Исключение считается полученным, даже если все ждущие были отменены
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict[str, int]:
+        return {"calls": self.calls, "loads": self.loads, "inflight": len(self._tasks)}